@@ -5,15 +5,21 @@ Generates service reports, stop reports, and GeoJSON files from GTFS data.
 """
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import cpu_count
 from typing import List, Optional
 
 from src.cli_parser import create_unified_parser, validate_unified_args
+from src.download import remove_feed_directory
 from src.orchestrators import (
     generate_service_reports_orchestrator,
     generate_stop_reports_orchestrator, 
     generate_geojson_reports_orchestrator,
     prepare_feed_directory,
-    get_date_list
+    get_date_list,
+    SERVICE_REPORT_FEED_FILES,
+    STOP_REPORT_FEED_FILES,
+    GEOJSON_FEED_FILES
 )
 from src.logger import get_logger
 
@@ -31,89 +37,137 @@ def main():
         validate_unified_args(args)
         
         # Prepare feed directory
+        # Only extract the feed files the requested reports read
+        feed_files = set()
+        if args.generate_services:
+            feed_files |= SERVICE_REPORT_FEED_FILES
+        if args.generate_stops:
+            feed_files |= STOP_REPORT_FEED_FILES
+        if args.generate_geojson:
+            feed_files |= GEOJSON_FEED_FILES
         feed_dir = prepare_feed_directory(
-            args.feed_dir, args.feed_url, args.output_dir, args.force_download
+            args.feed_dir, args.feed_url, args.output_dir, args.force_download, feed_files
         )
         
         if feed_dir is None:
             logger.info("Download was skipped (feed not modified). Exiting.")
             return
         
-        # Get date list for date-dependent reports
-        date_list = []
-        if args.generate_services or args.generate_stops:
-            date_list = get_date_list(
-                all_dates=args.all_dates,
-                start_date=getattr(args, 'start_date', None),
-                end_date=getattr(args, 'end_date', None),
-                feed_dir=feed_dir
-            )
-        
-        # Generate reports based on requested types
-        results = {}
-        
-        if args.generate_services:
-            logger.info("=== Generating Service Reports ===")
-            try:
-                results['services'] = generate_service_reports_orchestrator(
-                    feed_dir=feed_dir,
-                    output_dir=args.output_dir,
-                    all_dates_flag=args.all_dates,
+        try:
+            # Get date list for date-dependent reports once and share it between them
+            date_list = []
+            if args.generate_services or args.generate_stops:
+                date_list = get_date_list(
+                    all_dates=args.all_dates,
                     start_date=getattr(args, 'start_date', None),
                     end_date=getattr(args, 'end_date', None),
-                    service_extractor=args.service_extractor,
-                    rolling_dates_config_path=getattr(args, 'rolling_dates_config', None)
+                    feed_dir=feed_dir
                 )
-                logger.info(f"Service reports completed: {len(results['services']['generated_dates'])} dates processed")
-            except Exception as e:
-                logger.error(f"Service report generation failed: {e}")
-                results['services'] = {'error': str(e)}
-        
-        if args.generate_stops:
-            logger.info("=== Generating Stop Reports ===")
-            try:
-                results['stops'] = generate_stop_reports_orchestrator(
-                    feed_dir=feed_dir,
-                    output_dir=args.output_dir,
-                    all_dates_flag=args.all_dates,
-                    start_date=getattr(args, 'start_date', None),
-                    end_date=getattr(args, 'end_date', None),
-                    numeric_stop_code=args.numeric_stop_code,
-                    jobs=args.jobs,
-                    pretty=args.pretty,
-                    rolling_dates_config_path=getattr(args, 'rolling_dates_config', None)
-                )
-                logger.info(f"Stop reports completed: {len(results['stops']['generated_dates'])} dates processed")
-            except Exception as e:
-                logger.error(f"Stop report generation failed: {e}")
-                results['stops'] = {'error': str(e)}
-        
-        if args.generate_geojson:
-            logger.info("=== Generating GeoJSON Reports ===")
-            try:
-                results['geojson'] = generate_geojson_reports_orchestrator(
-                    feed_dir=feed_dir,
-                    output_dir=args.output_dir,
-                    pretty=args.pretty
-                )
-                logger.info(f"GeoJSON reports completed: {results['geojson']['shapes_count']} shapes processed")
-            except Exception as e:
-                logger.error(f"GeoJSON generation failed: {e}")
-                results['geojson'] = {'error': str(e)}
-        
-        # Summary
-        logger.info("=== Generation Summary ===")
-        for report_type, result in results.items():
-            if 'error' in result:
-                logger.error(f"{report_type.capitalize()}: FAILED - {result['error']}")
+            
+            # Service and stop reports both use worker processes; split the
+            # cores between them when they are generated at the same time
+            jobs = args.jobs if args.jobs > 0 else cpu_count()
+            service_jobs = stop_jobs = jobs
+            if args.generate_services and args.generate_stops:
+                service_jobs = max(1, jobs // 2)
+                stop_jobs = max(1, jobs - service_jobs)
+            
+            def generate_services():
+                logger.info("=== Generating Service Reports ===")
+                try:
+                    result = generate_service_reports_orchestrator(
+                        feed_dir=feed_dir,
+                        output_dir=args.output_dir,
+                        all_dates_flag=args.all_dates,
+                        start_date=getattr(args, 'start_date', None),
+                        end_date=getattr(args, 'end_date', None),
+                        service_extractor=args.service_extractor,
+                        rolling_dates_config_path=getattr(args, 'rolling_dates_config', None),
+                        dates=date_list,
+                        jobs=service_jobs
+                    )
+                    logger.info(f"Service reports completed: {len(result['generated_dates'])} dates processed")
+                    return result
+                except Exception as e:
+                    logger.error(f"Service report generation failed: {e}")
+                    return {'error': str(e)}
+            
+            def generate_stops():
+                logger.info("=== Generating Stop Reports ===")
+                try:
+                    result = generate_stop_reports_orchestrator(
+                        feed_dir=feed_dir,
+                        output_dir=args.output_dir,
+                        all_dates_flag=args.all_dates,
+                        start_date=getattr(args, 'start_date', None),
+                        end_date=getattr(args, 'end_date', None),
+                        numeric_stop_code=args.numeric_stop_code,
+                        jobs=stop_jobs,
+                        pretty=args.pretty,
+                        rolling_dates_config_path=getattr(args, 'rolling_dates_config', None),
+                        dates=date_list
+                    )
+                    logger.info(f"Stop reports completed: {len(result['generated_dates'])} dates processed")
+                    return result
+                except Exception as e:
+                    logger.error(f"Stop report generation failed: {e}")
+                    return {'error': str(e)}
+            
+            def generate_geojson():
+                logger.info("=== Generating GeoJSON Reports ===")
+                try:
+                    result = generate_geojson_reports_orchestrator(
+                        feed_dir=feed_dir,
+                        output_dir=args.output_dir,
+                        pretty=args.pretty
+                    )
+                    logger.info(f"GeoJSON reports completed: {result['shapes_count']} shapes processed")
+                    return result
+                except Exception as e:
+                    logger.error(f"GeoJSON generation failed: {e}")
+                    return {'error': str(e)}
+            
+            # Generate reports based on requested types
+            generators = {}
+            if args.generate_services:
+                generators['services'] = generate_services
+            if args.generate_stops:
+                generators['stops'] = generate_stops
+            if args.generate_geojson:
+                generators['geojson'] = generate_geojson
+            
+            # The report types are independent, so run them concurrently. Their worker
+            # pools are not forked while these threads run (see process_pool_context),
+            # so a single report type is generated on this thread and keeps forking
+            completed = {}
+            if len(generators) == 1:
+                for report_type, generate in generators.items():
+                    completed[report_type] = generate()
             else:
-                logger.info(f"{report_type.capitalize()}: SUCCESS")
-        
-        # Exit with error if any generation failed
-        if any('error' in result for result in results.values()):
-            sys.exit(1)
-        
-        logger.info("All requested reports generated successfully!")
+                with ThreadPoolExecutor(max_workers=len(generators)) as executor:
+                    futures = {executor.submit(generate): report_type for report_type, generate in generators.items()}
+                    for future in as_completed(futures):
+                        completed[futures[future]] = future.result()
+            
+            # Keep the summary in the order the report types were requested
+            results = {report_type: completed[report_type] for report_type in generators}
+            
+            # Summary
+            logger.info("=== Generation Summary ===")
+            for report_type, result in results.items():
+                if 'error' in result:
+                    logger.error(f"{report_type.capitalize()}: FAILED - {result['error']}")
+                else:
+                    logger.info(f"{report_type.capitalize()}: SUCCESS")
+            
+            # Exit with error if any generation failed
+            if any('error' in result for result in results.values()):
+                sys.exit(1)
+            
+            logger.info("All requested reports generated successfully!")
+        finally:
+            if args.feed_url:
+                remove_feed_directory(feed_dir)
         
     except Exception as e:
         logger.error(f"Report generation failed: {e}")
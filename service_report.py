@@ -2,84 +2,198 @@
 """
 Main script for generating service reports from GTFS data.
 """
+import multiprocessing
+import os
 import sys
 import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from datetime import datetime as dt
+from types import SimpleNamespace
+from typing import Optional
 
 from src.cli_parser import create_service_report_parser, CommonArgumentParser
-from src.orchestrators import generate_service_reports_orchestrator, prepare_feed_directory
+from src.common import get_all_feed_dates, date_range
+from src.download import remove_feed_directory
+from src.orchestrators import (get_service_extractor_class, prepare_feed_directory, load_service_trips,
+                               select_trips_for_services, SERVICE_REPORT_FEED_FILES)
 from src.logger import get_logger
-from src.report_data import get_service_report_data
-from src.report_writer import write_service_html, render_and_write_html
+from src.report_data import get_service_report_data_legacy
+from src.report_render import get_compiled_template
+from src.report_writer import write_service_html, render_and_write_html, render_and_write_html_many
+from src.routes import load_routes, get_route_order
+from src.stops import get_all_stops
+from src.trips import get_trip_ids
+from src.utils import fork_is_safe
 
 logger = get_logger("service_report")
 
 
 def parse_args():
-    parser = argparse.ArgumentParser(
-        description="Generate GTFS service reports for a date or date range.")
-    parser.add_argument('--start-date', type=str,
-                        help='Start date (YYYY-MM-DD)')
-    parser.add_argument('--end-date', type=str,
-                        help='End date (YYYY-MM-DD, inclusive)')
-    parser.add_argument('--all-dates', action='store_true', help='Process all dates in the feed')
-    parser.add_argument('--output-dir', type=str, default="./output/", help='Directory to write reports to (default: ./output/)')
-    parser.add_argument('--feed-dir', type=str, help="Path to the feed directory")
-    parser.add_argument('--feed-url', type=str, help="URL to download the GTFS feed from (if not using local feed directory)")
-    parser.add_argument('--force-download', action='store_true', help="Force download even if the feed hasn't been modified (only applies when using --feed-url)")
-    parser.add_argument('--service-extractor', type=str, default="default", help="Service extractor to use (default|lcg_muni|vgo_muni)")
+    parser = create_service_report_parser()
     args = parser.parse_args()
-
-    if not args.all_dates and not args.start_date:
-        parser.error('--start-date is required unless --all-dates is specified')
-    if not args.all_dates and not args.end_date:
-        parser.error('--end-date is required unless --all-dates is specified')
-    if args.feed_dir and args.feed_url:
-        parser.error("Specify either --feed-dir or --feed-url, not both.")
-    if not args.feed_dir and not args.feed_url:
-        parser.error("You must specify either a path to the existing feed (unzipped) or a URL to download the GTFS feed from.")
-    if args.feed_dir and not os.path.exists(args.feed_dir):
-        parser.error(f"Feed directory does not exist: {args.feed_dir}")
+    CommonArgumentParser.validate_common_args(args)
     return args
 
 
-def main():
-    from datetime import datetime as dt
-    args = parse_args()
-    output_dir = args.output_dir
-    feed_url = args.feed_url
-    generated_at = dt.now()  # Define at the start of main() for use throughout
-    if not feed_url:
-        feed_dir = args.feed_dir
-    else:
-        logger.info(f"Downloading GTFS feed from {feed_url}...")
-        feed_dir = download_feed_from_url(feed_url, output_dir, args.force_download)
-        if feed_dir is None:
-            logger.info("Download was skipped (feed not modified). Exiting.")
-            return
+# Per-run data for _generate_date_reports, set by run() before date workers are forked
+_RUN_CONTEXT: Optional[SimpleNamespace] = None
+
 
+def _generate_date_reports(current_date: str) -> tuple[str, list[dict]]:
+    """
+    Write the service pages and day index for one date, using the data loaded by run().
+
+    Returns:
+        Tuple of (current_date, summaries of the generated services).
+    """
+    context = _RUN_CONTEXT
+    output_dir = context.output_dir
+    generated_at = context.generated_at
+    stops = context.stops
+    trips = context.trips_by_date[current_date]
+    generated_services: list[dict] = []
+    logger.info(f"Starting service report generation for date {current_date}")
+    trip_ids = get_trip_ids(trips)
+    logger.info(f"Found {len(trip_ids)} trips for active services.")
+    
+    # Filter pre-loaded stop times by trips for this date
+    date_trip_ids = set(trip_ids)
+    stops_for_all_trips = {trip_id: stops for trip_id, stops in context.all_stops_for_trips.items()
+                          if trip_id in date_trip_ids}
+    logger.info(f"Using stop times for {len(stops_for_all_trips)} trips.")
+    # Prepare output directory for this date
+    date_dir = os.path.join(output_dir, current_date)
+    os.makedirs(date_dir, exist_ok=True)
+    # Group trips by actual_service_id
+    grouped_trips = defaultdict(list)
+    service_id_to_name = {}
+    canonical_to_original_ids = defaultdict(set)
+    for service_id, trip_list in trips.items():
+        try:
+            actual_service_id = context.extract_actual_service_id(service_id)
+        except Exception as e:
+            logger.warning(f"Failed to extract actual service id for {service_id}: {e}")
+            actual_service_id = service_id
+        try:
+            service_name = context.extract_service_name(service_id)
+        except Exception as e:
+            logger.warning(f"Failed to extract service name for {service_id}: {e}")
+            service_name = service_id
+        grouped_trips[actual_service_id].extend(trip_list)
+        canonical_to_original_ids[actual_service_id].add(service_id)
+        # The first service grouped under an id names it
+        service_id_to_name.setdefault(actual_service_id, service_name)
+
+    for actual_service_id, trip_list in grouped_trips.items():
+        service_name = service_id_to_name.get(actual_service_id, actual_service_id)
+        original_service_ids = sorted(canonical_to_original_ids.get(actual_service_id, []))
+        try:
+            # Prepare service data with timestamp for service template
+            service_data_with_timestamp = {
+                "generated_at": generated_at
+            }
+
+            filename = f"{actual_service_id}.html"
+            file_path = os.path.join(date_dir, filename)
+            # Add service_name to extra data for the report
+            extra_data = dict(service_data_with_timestamp)
+            extra_data["service_name"] = service_name
+            extra_data["original_service_ids"] = original_service_ids
+            write_service_html(file_path, context.feed_dir, actual_service_id, trip_list, current_date, stops_for_all_trips, extra_data, stops)
+            # Compute summary details for index
+            summary = get_service_report_data_legacy(context.feed_dir, actual_service_id, trip_list, current_date, stops_for_all_trips, stops)
+            # First departure and last arrival, computed while building the rows
+            first_departure = summary["first_departure"]
+            last_arrival = summary["last_arrival"]
+            # Unique lines with colors and trip counts, in order of first appearance
+            lines_by_name: dict[str, dict] = {}
+            for r in summary.get("trip_rows", []):
+                name = r.get("route_short_name")
+                if not name:
+                    continue
+                entry = lines_by_name.get(name)
+                if entry is None:
+                    lines_by_name[name] = {
+                        "short_name": name,
+                        "color": r.get("route_colour"),
+                        "count": 1
+                    }
+                else:
+                    entry["count"] += 1
+            lines = list(lines_by_name.values())
+            # Append enriched service info
+            generated_services.append({
+                "service_id": actual_service_id,
+                "service_name": service_name,
+                "original_service_ids": original_service_ids,
+                "filename": filename,
+                "first_departure": first_departure,
+                "last_arrival": last_arrival,
+                "total_distance": summary.get("total_distance"),
+                "lines": lines
+            })
+        except Exception as e:
+            logger.error(
+                f"Error generating report for service {actual_service_id} on {current_date}: {e}")
+    if generated_services:
+        # Compute unique lines for filter buttons
+        unique_day_lines: list[dict[str,str]] = []
+        seen_lines = set()
+        for svc in generated_services:
+            for ln in svc.get("lines", []):
+                name = ln.get("short_name")
+                color = ln.get("color")
+                if name and name not in seen_lines:
+                    seen_lines.add(name)
+                    unique_day_lines.append({"name": name, "color": color})
+        # Sort lines by order in routes.txt
+        route_order = context.route_order
+        unique_day_lines.sort(key=lambda ln: route_order.get(ln['name'], len(route_order)))
+        # Write per-date index
+        render_and_write_html(
+            "day_index.html.j2",
+            {"date": current_date, "services": generated_services, "day_lines": unique_day_lines, "generated_at": generated_at},
+            os.path.join(date_dir, "index.html")
+        )
+
+    logger.info(f"Service report generation completed for {current_date}.")
+    return current_date, generated_services
+
+
+def run(*, feed_dir: str, output_dir: str, start_date: Optional[str] = None,
+        end_date: Optional[str] = None, all_dates: bool = False,
+        service_extractor: str = "default", jobs: int = 0) -> None:
+    """
+    Generate service reports for an already extracted feed.
+
+    Args:
+        feed_dir: Path to the GTFS feed directory
+        output_dir: Directory to write reports to
+        start_date: Start date (YYYY-MM-DD), required unless all_dates is set
+        end_date: End date (YYYY-MM-DD, inclusive), defaults to start_date
+        all_dates: Process all dates in the feed
+        service_extractor: Service extractor to use (default|lcg_muni|vgo_muni)
+        jobs: Number of processes used to render trip pages and dates (0 for auto-detection)
+    """
+    generated_at = dt.now()
 
     # Select service extractor based on argument
-    extractor_arg = getattr(args, 'service_extractor', 'default')
-    if extractor_arg == 'lcg_muni':
-        service_extractor = LcgMunicipalServiceExtractor
-    elif extractor_arg == 'vgo_muni':
-        service_extractor = VgoMunicipalServiceExtractor
-    else:
-        service_extractor = DefaultServiceExtractor
+    service_extractor = get_service_extractor_class(service_extractor)
+    # Service ids repeat across dates, so parse each one only once per run
+    extract_actual_service_id = lru_cache(maxsize=None)(service_extractor.extract_actual_service_id_from_identifier)
+    extract_service_name = lru_cache(maxsize=None)(service_extractor.extract_service_name_from_identifier)
 
-    if args.all_dates:
-        all_dates = get_all_feed_dates(feed_dir)
-        if not all_dates:
+    if all_dates:
+        all_feed_dates = get_all_feed_dates(feed_dir)
+        if not all_feed_dates:
             logger.error('No valid dates found in feed.')
             return
-        date_list = all_dates
+        date_list = all_feed_dates
     else:
-        start_date = args.start_date
-        end_date = args.end_date or args.start_date
-        date_list = list(date_range(start_date, end_date))
-
-    all_generated_dates: list[str] = []
-    services_by_date: dict[str, list[dict[str, str]]] = {}
+        end_date = end_date or start_date
+        date_list = date_range(start_date, end_date)
 
     # Ensure date_list is not empty before processing
     if not date_list:
@@ -96,236 +210,119 @@ def main():
     
     routes = load_routes(feed_dir)
     logger.info(f"Loaded {len(routes)} routes from feed.")
+    # Day index line order, computed once instead of re-reading routes.txt per date
+    route_order = get_route_order(routes)
     
     # Load all trips once and reuse (significant performance improvement)
     logger.info("Loading all trips data...")
-    all_services = []
-    for date in date_list:
-        date_services = get_active_services(feed_dir, date)
-        all_services.extend(date_services)
-    
-    # Remove duplicates while preserving order
-    unique_services = list(dict.fromkeys(all_services))
-    all_trips = get_trips_for_services(feed_dir, unique_services)
-    logger.info(f"Loaded {sum(len(trips) for trips in all_trips.values())} trips for all services.")
-    
-    # Load all stop times once (biggest performance improvement)
-    all_trip_ids = [trip.trip_id for trip_list in all_trips.values() for trip in trip_list]
-    all_stops_for_trips = get_stops_for_trips(feed_dir, all_trip_ids)
-    logger.info(f"Loaded stop times for {len(all_stops_for_trips)} trips.")
+    active_by_date, all_trips, service_positions, all_stops_for_trips = load_service_trips(feed_dir, date_list, routes)
 
-    # Process each date in date_list
+    # Select each date's trips, skipping dates without active services
+    trips_by_date: dict[str, dict[str, list]] = {}
     for current_date in date_list:
-        generated_services: list[dict[str, str]] = []
-        logger.info(f"Starting service report generation for date {current_date}")
-        active_services = get_active_services(feed_dir, current_date)
+        active_services = active_by_date[current_date]
         if active_services:
             logger.info(
                 f"Found {len(active_services)} active services for date {current_date}.")
         else:
-            logger.info("No active services found for the given date.")
+            logger.info(f"No active services found for date {current_date}.")
             continue
         
-        # Filter pre-loaded trips by active services for this date
-        trips = {service_id: trip_list for service_id, trip_list in all_trips.items() 
-                if service_id in active_services}
-        total_trip_count = sum(len(trip_list) for trip_list in trips.values())
-        logger.info(f"Found {total_trip_count} trips for active services.")
-        
-        # Filter pre-loaded stop times by trips for this date
-        date_trip_ids = [trip.trip_id for trip_list in trips.values() for trip in trip_list]
-        stops_for_all_trips = {trip_id: stops for trip_id, stops in all_stops_for_trips.items()
-                              if trip_id in date_trip_ids}
-        logger.info(f"Using stop times for {len(stops_for_all_trips)} trips.")
-        # Prepare output directory for this date
-        date_dir = os.path.join(output_dir, current_date)
-        os.makedirs(date_dir, exist_ok=True)
-        # Group trips by actual_service_id
-        grouped_trips = {}
-        service_id_to_name = {}
-        canonical_to_original_ids = {}
-        for service_id, trip_list in trips.items():
-            try:
-                actual_service_id = service_extractor.extract_actual_service_id_from_identifier(service_id)
-            except Exception as e:
-                logger.warning(f"Failed to extract actual service id for {service_id}: {e}")
-                actual_service_id = service_id
-            try:
-                service_name = service_extractor.extract_service_name_from_identifier(service_id)
-            except Exception as e:
-                logger.warning(f"Failed to extract service name for {service_id}: {e}")
-                service_name = service_id
-            if actual_service_id not in grouped_trips:
-                grouped_trips[actual_service_id] = []
-                service_id_to_name[actual_service_id] = service_name
-                canonical_to_original_ids[actual_service_id] = set()
-            grouped_trips[actual_service_id].extend(trip_list)
-            canonical_to_original_ids[actual_service_id].add(service_id)
-
-        for actual_service_id, trip_list in grouped_trips.items():
-            service_name = service_id_to_name.get(actual_service_id, actual_service_id)
-            original_service_ids = sorted(canonical_to_original_ids.get(actual_service_id, []))
-            try:
-                # Restore the assignment of route_short_name and route_color to each trip
-                for trip in trip_list:
-                    route_info = routes.get(trip.route_id)
-                    if route_info:
-                        trip.route_short_name = route_info['route_short_name']
-                        trip.route_color = route_info['route_color']
-                    else:
-                        logger.warning(
-                            f"Route ID {trip.route_id} not found in routes data.")
-
-                # --- New: Generate trip detail pages ---
-                trips_dir = os.path.join(output_dir, "trips")
-                os.makedirs(trips_dir, exist_ok=True)
-                # Prepare service data with timestamp for service template
-                service_data_with_timestamp = {
-                    "generated_at": generated_at
-                }
-                for trip in trip_list:
-                    try:
-                        trip_id = trip.trip_id
-                        trip_detail_filename = f"trips/{trip_id}.html"
-                        trip_detail_path = os.path.join(output_dir, trip_detail_filename)
-                        # Gather stop sequence and times for this trip
-                        stops_for_trip = stops_for_all_trips.get(trip_id, [])
-                        # Each stop: stop_id, stop_name, arrival_time, departure_time, stop_lat, stop_lon
-                        stop_sequence = []
-                        # Build a lookup for stop_id -> stop_name from all stops
-                        stop_id_to_obj = {}
-                        for stop_id, stop_obj in stops.items():
-                            # stops is a dict with stop_id as key and Stop object as value
-                            stop_id_to_obj[stop_id] = stop_obj
-                        for stop in stops_for_trip:
-                            # Defensive: stop may be a dict or object or even a str (stop_id)
-                            if hasattr(stop, "stop_id"):
-                                stop_id = stop.stop_id
-                                arrival_time = getattr(stop, "arrival_time", None)
-                                departure_time = getattr(stop, "departure_time", None)
-                            elif isinstance(stop, dict):
-                                stop_id = stop.get("stop_id")
-                                arrival_time = stop.get("arrival_time")
-                                departure_time = stop.get("departure_time")
-                            else:
-                                stop_id = stop
-                                arrival_time = None
-                                departure_time = None
-                            stop_info = {
-                                "stop_id": stop_id,
-                                "stop_name": stop_id_to_obj.get(stop_id, stop_id).stop_name,
-                                "arrival_time": arrival_time,
-                                "departure_time": departure_time,
-                                "stop_lat": stop_id_to_obj.get(stop_id, stop_id).stop_lat if stop_id in stop_id_to_obj else None,
-                                "stop_lon": stop_id_to_obj.get(stop_id, stop_id).stop_lon if stop_id in stop_id_to_obj else None
-                            }
-                            stop_sequence.append(stop_info)
-
-                        trip_name = VgoMunicipalServiceExtractor.get_trip_name_from_trip_id(trip_id)
-
-                        trip_detail_data = {
-                            "trip_id": trip_id,
-                            "trip_name": trip_name,
-                            "service_id": trip.service_id,  # always original GTFS service_id
-                            "date": current_date,
-                            "route_short_name": getattr(trip, "route_short_name", None),
-                            "route_color": getattr(trip, "route_color", None),
-                            "shape_id": getattr(trip, "shape_id", None),  # always original GTFS shape_id
-                            "stop_sequence": stop_sequence,
-                            "generated_at": generated_at
-                        }
-                        # Render trip detail page
-                        render_and_write_html(
-                            "trip_detail.html.j2",
-                            trip_detail_data,
-                            trip_detail_path
-                        )
-                        # Attach the filename to the trip for linking from service report
-                        trip.trip_detail_filename = trip_detail_filename
-                    except Exception as e:
-                        logger.error(f"Error generating trip detail page for trip {trip_id} on {current_date}: {e}")
-
-                # --- End new trip detail page generation ---
-
-                filename = f"{actual_service_id}.html"
-                file_path = os.path.join(date_dir, filename)
-                # Add service_name to extra data for the report
-                extra_data = dict(service_data_with_timestamp)
-                extra_data["service_name"] = service_name
-                extra_data["original_service_ids"] = original_service_ids
-                write_service_html(file_path, feed_dir, actual_service_id, trip_list, current_date, stops_for_all_trips, extra_data, stops)
-                # Compute summary details for index
-                summary = get_service_report_data(feed_dir, actual_service_id, trip_list, current_date, stops_for_all_trips, stops)
-                # First departure and last arrival
-                first_departure = summary["trip_rows"][0]["first_arrival"] if summary.get("trip_rows") else None
-                last_arrival = max(r.get("last_arrival") for r in summary.get("trip_rows", [])) if summary.get("trip_rows") else None
-                # Unique lines with colors and counts
-                # Compute trip counts per line
-                counts: dict[str, int] = {}
-                for r in summary.get("trip_rows", []):
-                    name = r.get("route_short_name")
-                    if name:
-                        counts[name] = counts.get(name, 0) + 1
-                seen = set()
-                lines = []
-                # Preserve order of first appearance
-                for r in summary.get("trip_rows", []):
-                    name = r.get("route_short_name")
-                    color = r.get("route_colour")
-                    if name and name not in seen:
-                        seen.add(name)
-                        lines.append({
-                            "short_name": name,
-                            "color": color,
-                            "count": counts.get(name, 0)
-                        })
-                # Append enriched service info
-                generated_services.append({
-                    "service_id": actual_service_id,
-                    "service_name": service_name,
-                    "original_service_ids": original_service_ids,
-                    "filename": filename,
-                    "first_departure": first_departure,
-                    "last_arrival": last_arrival,
-                    "total_distance": summary.get("total_distance"),
-                    "lines": lines
+        trips_by_date[current_date] = select_trips_for_services(all_trips, service_positions, active_services)
+
+    # --- Generate trip detail pages ---
+    # Trip pages are shared by every date a trip runs on and each date used to
+    # overwrite them, so render each one once, for the last date the trip runs on
+    last_trip_dates: dict[str, tuple] = {}
+    for current_date, trips in trips_by_date.items():
+        for trip_list in trips.values():
+            for trip in trip_list:
+                last_trip_dates[trip.trip_id] = (trip, current_date)
+    if trips_by_date:
+        os.makedirs(os.path.join(output_dir, "trips"), exist_ok=True)
+    trip_pages = []
+    page_trips = []
+    for trip_id, (trip, current_date) in last_trip_dates.items():
+        try:
+            trip_detail_filename = f"trips/{trip_id}.html"
+            trip_detail_path = os.path.join(output_dir, trip_detail_filename)
+            # Each stop: stop_id, stop_name, arrival_time, departure_time, stop_lat, stop_lon
+            stop_sequence = []
+            for stop_time in all_stops_for_trips.get(trip_id, []):
+                stop_id = stop_time.stop_id
+                # stops is already a dict with stop_id as key and Stop object as value;
+                # stops missing from stops.txt are shown by their id
+                stop_obj = stops.get(stop_id)
+                stop_sequence.append({
+                    "stop_id": stop_id,
+                    "stop_name": stop_obj.stop_name if stop_obj else stop_id,
+                    "arrival_time": stop_time.arrival_time,
+                    "departure_time": stop_time.departure_time,
+                    "stop_lat": stop_obj.stop_lat if stop_obj else None,
+                    "stop_lon": stop_obj.stop_lon if stop_obj else None
                 })
-            except Exception as e:
-                logger.error(
-                    f"Error generating report for service {service_id} on {current_date}: {e}")
-        # Ensure all valid dates are added to all_generated_dates
-        if current_date not in all_generated_dates:
-            all_generated_dates.append(current_date)
+
+            trip_name = service_extractor.get_trip_name_from_trip_id(trip_id)
+
+            trip_detail_data = {
+                "trip_id": trip_id,
+                "trip_name": trip_name,
+                "service_id": trip.service_id,  # always original GTFS service_id
+                "date": current_date,
+                # Route fields are always set on TripLine, by assign_route_info or to ""
+                "route_short_name": trip.route_short_name,
+                "route_color": trip.route_color,
+                "shape_id": trip.shape_id,  # always original GTFS shape_id
+                "stop_sequence": stop_sequence,
+                "generated_at": generated_at
+            }
+            trip_pages.append((trip_detail_data, trip_detail_path))
+            page_trips.append((trip, trip_detail_filename, current_date))
+        except Exception as e:
+            logger.error(f"Error generating trip detail page for trip {trip_id} on {current_date}: {e}")
+    for (trip, trip_detail_filename, current_date), error in zip(page_trips, render_and_write_html_many("trip_detail.html.j2", trip_pages, jobs)):
+        if error is None:
+            # Attach the filename to the trip for linking from service report
+            trip.trip_detail_filename = trip_detail_filename
+        else:
+            logger.error(f"Error generating trip detail page for trip {trip.trip_id} on {current_date}: {error}")
+    # --- End trip detail page generation ---
+
+    # Dates only write their own directory, so they can be generated in parallel
+    global _RUN_CONTEXT
+    _RUN_CONTEXT = SimpleNamespace(
+        feed_dir=feed_dir,
+        output_dir=output_dir,
+        generated_at=generated_at,
+        extract_actual_service_id=extract_actual_service_id,
+        extract_service_name=extract_service_name,
+        stops=stops,
+        route_order=route_order,
+        all_stops_for_trips=all_stops_for_trips,
+        trips_by_date=trips_by_date
+    )
+    date_jobs = min(jobs if jobs > 0 else (os.cpu_count() or 1), len(trips_by_date))
+    try:
+        # The workers read _RUN_CONTEXT, so they must be forked from this process
+        if date_jobs > 1 and fork_is_safe():
+            # Forked workers inherit the loaded feed and the compiled templates
+            # instead of receiving a pickled copy or compiling their own
+            get_compiled_template("service.html.j2")
+            get_compiled_template("day_index.html.j2")
+            with ProcessPoolExecutor(max_workers=date_jobs, mp_context=multiprocessing.get_context("fork")) as executor:
+                date_results = list(executor.map(_generate_date_reports, trips_by_date))
+        else:
+            date_results = [_generate_date_reports(current_date) for current_date in trips_by_date]
+    finally:
+        _RUN_CONTEXT = None
+
+    all_generated_dates: list[str] = []
+    services_by_date: dict[str, list[dict[str, str]]] = {}
+    for current_date, generated_services in date_results:
+        all_generated_dates.append(current_date)
         if generated_services:
             services_by_date[current_date] = generated_services
-            # Compute unique lines for filter buttons
-            unique_day_lines: list[dict[str,str]] = []
-            seen_lines = set()
-            for svc in generated_services:
-                for ln in svc.get("lines", []):
-                    name = ln.get("short_name")
-                    color = ln.get("color")
-                    if name and name not in seen_lines:
-                        seen_lines.add(name)
-                        unique_day_lines.append({"name": name, "color": color})
-            # Sort lines by order in routes.txt
-            import csv
-            try:
-                routes_path = os.path.join(feed_dir, 'routes.txt')
-                with open(routes_path, encoding='utf-8') as rf:
-                    reader = csv.DictReader(rf)
-                    order = [row.get('route_short_name', '') for row in reader]
-            except Exception:
-                order = [ln['name'] for ln in unique_day_lines]
-            unique_day_lines.sort(key=lambda ln: order.index(ln['name']) if ln['name'] in order else len(order))
-            # Write per-date index
-            render_and_write_html(
-                "day_index.html.j2",
-                {"date": current_date, "services": generated_services, "day_lines": unique_day_lines, "generated_at": generated_at},
-                os.path.join(date_dir, "index.html")
-            )
-
-        logger.info(f"Service report generation completed for {current_date}.")
+
     # Write top-level index
     if all_generated_dates:
         render_and_write_html(
@@ -335,11 +332,46 @@ def main():
         )
     logger.info("Service report generation completed.")
 
-    if feed_url:
-        if os.path.exists(feed_dir):
-            shutil.rmtree(feed_dir)
-            logger.info(f"Removed temporary feed directory: {feed_dir}")
 
+def run_with_args(args) -> None:
+    """
+    Run the service report from a namespace instead of the command line.
+
+    Accepts an argparse.Namespace or types.SimpleNamespace with feed_dir and output_dir;
+    start_date, end_date, all_dates, service_extractor and jobs are optional.
+    """
+    run(
+        feed_dir=args.feed_dir,
+        output_dir=args.output_dir,
+        start_date=getattr(args, 'start_date', None),
+        end_date=getattr(args, 'end_date', None),
+        all_dates=getattr(args, 'all_dates', False),
+        service_extractor=getattr(args, 'service_extractor', 'default'),
+        jobs=getattr(args, 'jobs', 0)
+    )
+
+
+def main():
+    args = parse_args()
+    feed_dir = prepare_feed_directory(args.feed_dir, args.feed_url, args.output_dir, args.force_download,
+                                      SERVICE_REPORT_FEED_FILES)
+    if feed_dir is None:
+        logger.info("Download was skipped (feed not modified). Exiting.")
+        return
+
+    try:
+        run_with_args(SimpleNamespace(
+            feed_dir=feed_dir,
+            output_dir=args.output_dir,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            all_dates=args.all_dates,
+            service_extractor=args.service_extractor,
+            jobs=args.jobs
+        ))
+    finally:
+        if args.feed_url:
+            remove_feed_directory(feed_dir)
 
 
 if __name__ == "__main__":
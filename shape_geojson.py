@@ -7,7 +7,8 @@ import sys
 import traceback
 
 from src.cli_parser import create_shape_geojson_parser, CommonArgumentParser
-from src.orchestrators import generate_geojson_reports_orchestrator, prepare_feed_directory
+from src.download import remove_feed_directory
+from src.orchestrators import generate_geojson_reports_orchestrator, prepare_feed_directory, GEOJSON_FEED_FILES
 from src.logger import get_logger
 
 logger = get_logger("shape_geojson")
@@ -25,24 +26,28 @@ def main():
         
         # Prepare feed directory
         feed_dir = prepare_feed_directory(
-            args.feed_dir, args.feed_url, args.output_dir, args.force_download
+            args.feed_dir, args.feed_url, args.output_dir, args.force_download, GEOJSON_FEED_FILES
         )
         
         if feed_dir is None:
             logger.info("Download was skipped (feed not modified). Exiting.")
             return
         
-        # Generate GeoJSON reports
-        result = generate_geojson_reports_orchestrator(
-            feed_dir=feed_dir,
-            output_dir=args.output_dir,
-            pretty=args.pretty
-        )
-        
-        logger.info(f"GeoJSON generation completed successfully:")
-        logger.info(f"  - Processed {result['shapes_count']} shapes")
-        logger.info(f"  - Generated {result['files_written']} files")
-        logger.info(f"  - Created {result['individual_shapes']} individual shape files")
+        try:
+            # Generate GeoJSON reports
+            result = generate_geojson_reports_orchestrator(
+                feed_dir=feed_dir,
+                output_dir=args.output_dir,
+                pretty=args.pretty
+            )
+            
+            logger.info(f"GeoJSON generation completed successfully:")
+            logger.info(f"  - Processed {result['shapes_count']} shapes")
+            logger.info(f"  - Generated {result['files_written']} files")
+            logger.info(f"  - Created {result['individual_shapes']} individual shape files")
+        finally:
+            if args.feed_url:
+                remove_feed_directory(feed_dir)
         
     except Exception as e:
         logger.error(f"GeoJSON generation failed: {e}")
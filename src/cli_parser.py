@@ -4,9 +4,19 @@ This module provides common argument parsing patterns to reduce duplication.
 """
 import argparse
 import os
+from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 
+def iso_date(value: str) -> str:
+    """Argparse type that validates a YYYY-MM-DD date and returns it in ISO form."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
 class CommonArgumentParser:
     """Base class for common CLI argument patterns."""
     
@@ -26,10 +36,10 @@ class CommonArgumentParser:
         date_group = parser.add_mutually_exclusive_group(required=required)
         date_group.add_argument('--all-dates', action='store_true',
                                help='Process all dates in the feed')
-        date_group.add_argument('--start-date', type=str,
+        date_group.add_argument('--start-date', type=iso_date,
                                help='Start date (YYYY-MM-DD)')
         
-        parser.add_argument('--end-date', type=str,
+        parser.add_argument('--end-date', type=iso_date,
                            help='End date (YYYY-MM-DD, inclusive)')
         return date_group
 
@@ -41,36 +51,44 @@ class CommonArgumentParser:
         parser.add_argument('--force-download', action='store_true',
                            help="Force download even if the feed hasn't been modified")
         parser.add_argument('--pretty', action='store_true',
-                           help="Pretty-print JSON output")
+                           help="Pretty-print JSON output, for debugging (default is minified JSON)")
         parser.add_argument('--rolling-dates-config', type=str,
                            help="Path to rolling dates configuration file (JSON)")
 
     @staticmethod
     def validate_common_args(args):
         """Validate common argument combinations."""
+        # Read the namespace once; parsers only define some of these arguments
+        values = vars(args)
+
         # Date validation
-        if hasattr(args, 'start_date') and hasattr(args, 'end_date'):
-            if not getattr(args, 'all_dates', False):
-                if not getattr(args, 'start_date', None):
+        if 'start_date' in values and 'end_date' in values:
+            if not values.get('all_dates', False):
+                if not values.get('start_date'):
                     raise argparse.ArgumentError(None, '--start-date is required unless --all-dates is specified')
-                if getattr(args, 'start_date', None) and not getattr(args, 'end_date', None):
+                if values.get('start_date') and not values.get('end_date'):
                     raise argparse.ArgumentError(None, '--end-date is required when --start-date is specified')
 
         # Feed source validation
-        if hasattr(args, 'feed_dir') and hasattr(args, 'feed_url'):
-            if getattr(args, 'feed_dir', None) and getattr(args, 'feed_url', None):
+        if 'feed_dir' in values and 'feed_url' in values:
+            if values.get('feed_dir') and values.get('feed_url'):
                 raise argparse.ArgumentError(None, "Specify either --feed-dir or --feed-url, not both.")
-            if not getattr(args, 'feed_dir', None) and not getattr(args, 'feed_url', None):
+            if not values.get('feed_dir') and not values.get('feed_url'):
                 raise argparse.ArgumentError(None, "You must specify either --feed-dir or --feed-url.")
 
         # Feed directory existence validation
-        if hasattr(args, 'feed_dir') and getattr(args, 'feed_dir', None):
-            if not os.path.exists(args.feed_dir):
-                raise argparse.ArgumentError(None, f"Feed directory does not exist: {args.feed_dir}")
+        if values.get('feed_dir'):
+            if not os.path.exists(values['feed_dir']):
+                raise argparse.ArgumentError(None, f"Feed directory does not exist: {values['feed_dir']}")
 
 
+@lru_cache(maxsize=1)
 def create_service_report_parser() -> argparse.ArgumentParser:
-    """Create argument parser for service reports."""
+    """
+    Create argument parser for service reports.
+
+    Parsers are not modified after construction, so each one is built once per process.
+    """
     parser = argparse.ArgumentParser(
         description="Generate GTFS service reports for a date or date range.")
     
@@ -80,10 +98,13 @@ def create_service_report_parser() -> argparse.ArgumentParser:
     
     parser.add_argument('--service-extractor', type=str, default="default",
                        help="Service extractor to use (default|lcg_muni|vgo_muni)")
+    parser.add_argument('--jobs', type=int, default=0,
+                       help="Number of parallel processes used to render trip pages and dates (0 for auto-detection)")
     
     return parser
 
 
+@lru_cache(maxsize=1)
 def create_stop_report_parser() -> argparse.ArgumentParser:
     """Create argument parser for stop reports."""
     parser = argparse.ArgumentParser(
@@ -101,6 +122,7 @@ def create_stop_report_parser() -> argparse.ArgumentParser:
     return parser
 
 
+@lru_cache(maxsize=1)
 def create_shape_geojson_parser() -> argparse.ArgumentParser:
     """Create argument parser for GeoJSON shape generation."""
     parser = argparse.ArgumentParser(
@@ -112,6 +134,7 @@ def create_shape_geojson_parser() -> argparse.ArgumentParser:
     return parser
 
 
+@lru_cache(maxsize=1)
 def create_unified_parser() -> argparse.ArgumentParser:
     """Create argument parser for the unified report generator."""
     parser = argparse.ArgumentParser(
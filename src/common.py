@@ -3,67 +3,130 @@ Common utilities for GTFS report generation.
 """
 import os
 import csv
-from datetime import datetime, timedelta
-from typing import List
+import json
+import threading
+from datetime import date
+from typing import Callable, List
+from src.feed_cache import FEED_CACHE_DIR, get_source_key, is_feed_cache_disabled
+# time_to_seconds lives in src.utils; it is re-exported here for existing callers
+from src.utils import time_to_seconds
 
+# Feed dates are cached next to the feed as small JSON files, one per calendar file
+CALENDAR_FEED_DATES_CACHE_FILE = 'calendar_feed_dates.json'
+CALENDAR_DATES_FEED_DATES_CACHE_FILE = 'calendar_dates_feed_dates.json'
 
-def date_range(start: str, end: str):
-    """Generate date range from start to end (inclusive)."""
-    start_dt = datetime.strptime(start, "%Y-%m-%d")
-    end_dt = datetime.strptime(end, "%Y-%m-%d")
-    while start_dt <= end_dt:
-        yield start_dt.strftime("%Y-%m-%d")
-        start_dt += timedelta(days=1)
+
+def date_range(start: str, end: str) -> List[str]:
+    """Return the dates from start to end (inclusive) as ISO strings."""
+    start_day = date.fromisoformat(start).toordinal()
+    end_day = date.fromisoformat(end).toordinal()
+    return [date.fromordinal(day).isoformat() for day in range(start_day, end_day + 1)]
 
 
 def get_all_feed_dates(feed_dir: str) -> List[str]:
     """
     Returns all dates the feed is valid for, using calendar.txt if present, else calendar_dates.txt.
+
+    The dates are cached in the feed directory, so repeat runs skip the scan while
+    the calendar files are unchanged.
     """
     calendar_path = os.path.join(feed_dir, 'calendar.txt')
     calendar_dates_path = os.path.join(feed_dir, 'calendar_dates.txt')
     
     # Try calendar.txt first
     if os.path.exists(calendar_path):
-        with open(calendar_path, encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            start_dates: List[str] = []
-            end_dates: List[str] = []
-            for row in reader:
-                if row.get('start_date') and row.get('end_date'):
-                    start_dates.append(row['start_date'])
-                    end_dates.append(row['end_date'])
-            if start_dates and end_dates:
-                min_date = min(start_dates)
-                max_date = max(end_dates)
-                # Convert YYYYMMDD to YYYY-MM-DD
-                start = datetime.strptime(min_date, '%Y%m%d')
-                end = datetime.strptime(max_date, '%Y%m%d')
-                result: List[str] = []
-                while start <= end:
-                    result.append(start.strftime('%Y-%m-%d'))
-                    start += timedelta(days=1)
-                return result
+        dates = _get_cached_feed_dates(calendar_path, CALENDAR_FEED_DATES_CACHE_FILE, _read_calendar_feed_dates)
+        if dates:
+            return dates
     
     # Fallback: use calendar_dates.txt
     if os.path.exists(calendar_dates_path):
-        with open(calendar_dates_path, encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            dates: set[str] = set()
-            for row in reader:
-                if row.get('exception_type') == '1' and row.get('date'):
-                    # Convert YYYYMMDD to YYYY-MM-DD
-                    d = row['date']
-                    dates.add(f"{d[:4]}-{d[4:6]}-{d[6:]}")
-            return sorted(dates)
+        return _get_cached_feed_dates(calendar_dates_path, CALENDAR_DATES_FEED_DATES_CACHE_FILE,
+                                      _read_calendar_dates_feed_dates)
     
     return []
 
 
-def time_to_seconds(time_str: str) -> int:
-    """Convert HH:MM:SS to seconds since midnight."""
-    parts = time_str.split(':')
-    if len(parts) != 3:
-        return 0
-    hours, minutes, seconds = map(int, parts)
-    return hours * 3600 + minutes * 60 + seconds
+def _get_cached_feed_dates(source_path: str, cache_name: str, read_dates: Callable[[str], List[str]]) -> List[str]:
+    """
+    Return the dates read from source_path, reading the file only if it changed since the last run.
+
+    The cache file holds {"key": [mtime_ns, size], "dates": [...]} for the version of
+    source_path the dates were read from; an unreadable cache file is read again.
+    """
+    feed_dir = os.path.dirname(source_path)
+    cache_path = os.path.join(feed_dir, FEED_CACHE_DIR, cache_name)
+    key = list(get_source_key(source_path))
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['key'] == key:
+            return cached['dates']
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+
+    dates = read_dates(source_path)
+    if not is_feed_cache_disabled(feed_dir):
+        # Written to a temporary file first, as report generators may read the dates concurrently
+        temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'dates': dates}, f)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return dates
+
+
+def _read_calendar_feed_dates(calendar_path: str) -> List[str]:
+    """Expand the overall start_date..end_date range of calendar.txt into YYYY-MM-DD days."""
+    with open(calendar_path, encoding='utf-8', newline='') as f:
+        # Only the overall range is needed, so keep a running min/max
+        # instead of collecting every start and end date
+        reader = csv.reader(f)
+        header = next(reader, [])
+        min_date = max_date = None
+        if 'start_date' in header and 'end_date' in header:
+            start_index = header.index('start_date')
+            end_index = header.index('end_date')
+            width = max(start_index, end_index) + 1
+            for row in reader:
+                if len(row) < width:
+                    continue
+                start_date = row[start_index]
+                end_date = row[end_index]
+                if start_date and end_date:
+                    if min_date is None or start_date < min_date:
+                        min_date = start_date
+                    if max_date is None or end_date > max_date:
+                        max_date = end_date
+    if not (min_date and max_date):
+        return []
+    # Expand YYYYMMDD bounds into YYYY-MM-DD days, stepping by day ordinal
+    start_day = _parse_gtfs_date(min_date).toordinal()
+    end_day = _parse_gtfs_date(max_date).toordinal()
+    return [date.fromordinal(day).isoformat() for day in range(start_day, end_day + 1)]
+
+
+def _parse_gtfs_date(value: str) -> date:
+    """Parse a GTFS YYYYMMDD date without going through strptime."""
+    return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+
+def _read_calendar_dates_feed_dates(calendar_dates_path: str) -> List[str]:
+    """Return the sorted YYYY-MM-DD dates that calendar_dates.txt adds service on."""
+    with open(calendar_dates_path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        dates: set[str] = set()
+        if 'date' in header and 'exception_type' in header:
+            date_index = header.index('date')
+            exception_type_index = header.index('exception_type')
+            width = max(date_index, exception_type_index) + 1
+            for row in reader:
+                if len(row) >= width and row[exception_type_index] == '1' and row[date_index]:
+                    dates.add(row[date_index])
+    # Convert YYYYMMDD to YYYY-MM-DD
+    return sorted(f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in dates)
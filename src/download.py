@@ -1,14 +1,59 @@
+import hashlib
 import os
+import shutil
 import tempfile
 import zipfile
 import requests
 import json
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.feed_cache import disable_feed_cache
 from src.logger import get_logger
+from src.utils import dumps_json
 
 logger = get_logger("download")
 
+# Size of the chunks read from the HTTP stream while downloading the feed
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+# Downloads up to this size are kept in memory before being extracted
+SPOOL_MAX_SIZE = 64 << 20
+# (connect, read) timeouts in seconds for feed requests
+REQUEST_TIMEOUT = (5, 60)
+# Number of threads used to decompress feed files; zlib releases the GIL while inflating
+EXTRACT_THREADS = min(8, os.cpu_count() or 1)
+# Feeds downloaded for an output directory are extracted under it, one directory per
+# archive, so an unchanged feed is not extracted again and keeps its parsed-file caches
+EXTRACTED_FEEDS_DIR = '.feed_cache'
+# Record in each extracted feed directory of the response validators and extracted files
+EXTRACTED_FEED_RECORD = '.feed_source'
+
+# Feed directories extracted to the system temporary directory by this process
+_temporary_feed_dirs: set = set()
+
+
+def _create_session() -> requests.Session:
+    """Create a session that keeps connections alive and retries transient server errors."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(['HEAD', 'GET']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Shared by every download so repeat requests reuse the same pooled connection
+_SESSION = _create_session()
+
 def _get_metadata_path(output_dir: str) -> str:
     """Get the path to the metadata file for storing ETag and Last-Modified info."""
     return os.path.join(output_dir, '.gtfsmetadata')
@@ -36,95 +81,233 @@ def _save_metadata(output_dir: str, etag: Optional[str], last_modified: Optional
     os.makedirs(output_dir, exist_ok=True)
     
     try:
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
+        # Same encoder as the report JSON: orjson when installed, else the standard library
+        with open(metadata_path, 'wb') as f:
+            f.write(dumps_json(metadata, pretty=True))
     except IOError as e:
         logger.warning(f"Failed to save metadata to {metadata_path}: {e}")
 
-def _check_if_modified(feed_url: str, output_dir: str) -> Tuple[bool, Optional[str], Optional[str]]:
-    """
-    Check if the feed has been modified using conditional headers.
-    Returns (is_modified, etag, last_modified)
-    """
-    metadata = _load_metadata(output_dir)
-    if not metadata:
-        return True, None, None
-    
+def _build_conditional_headers(metadata: Optional[dict]) -> dict:
+    """Build If-None-Match/If-Modified-Since headers from stored metadata."""
     headers = {}
+    if not metadata:
+        return headers
     if metadata.get('etag'):
         headers['If-None-Match'] = metadata['etag']
     if metadata.get('last_modified'):
         headers['If-Modified-Since'] = metadata['last_modified']
-    
-    if not headers:
-        return True, None, None
-        
+    return headers
+
+def _extract_feed(zip_ref: zipfile.ZipFile, target_dir: str, feed_files: Optional[Iterable[str]] = None) -> None:
+    """
+    Extract the members of the feed archive into target_dir.
+
+    Feed files are independent, so they are decompressed on a thread pool. ZipFile
+    serializes the reads from the archive, but not the directory creation for
+    members in subdirectories, so those are extracted afterwards on this thread.
+
+    Args:
+        zip_ref: Open feed archive
+        target_dir: Directory to extract the feed into
+        feed_files: Names of the files to extract, or None to extract every member
+    """
+    members = zip_ref.infolist()
+    if feed_files is not None:
+        feed_files = set(feed_files)
+        members = [member for member in members if member.filename in feed_files]
+    top_level = [member for member in members if '/' not in member.filename]
+    nested = [member for member in members if '/' in member.filename]
+
+    if len(top_level) > 1 and EXTRACT_THREADS > 1:
+        with ThreadPoolExecutor(max_workers=min(EXTRACT_THREADS, len(top_level))) as executor:
+            # Consume the results so any extraction error is raised here
+            list(executor.map(lambda member: zip_ref.extract(member, target_dir), top_level))
+    else:
+        zip_ref.extractall(target_dir, top_level)
+
+    if nested:
+        zip_ref.extractall(target_dir, nested)
+
+def _load_feed_record(feed_dir: str) -> Optional[dict]:
+    """Load the record of an extracted feed directory, or None if it has none."""
+    record_path = os.path.join(feed_dir, EXTRACTED_FEED_RECORD)
     try:
-        response = requests.head(feed_url, headers=headers)
-        
-        if response.status_code == 304:
-            logger.info("Feed has not been modified (304 Not Modified), skipping download")
-            return False, metadata.get('etag'), metadata.get('last_modified')
-        elif response.status_code == 200:
-            etag = response.headers.get('ETag')
-            last_modified = response.headers.get('Last-Modified')
-            return True, etag, last_modified
-        else:
-            logger.warning(f"Unexpected response status {response.status_code} when checking for modifications, proceeding with download")
-            return True, None, None
-    except requests.RequestException as e:
-        logger.warning(f"Failed to check if feed has been modified: {e}, proceeding with download")
-        return True, None, None
+        with open(record_path, 'rb') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (ValueError, OSError) as e:
+        logger.warning(f"Ignoring unreadable feed record {record_path}: {e}")
+        return None
+
+def _save_feed_record(feed_dir: str, etag: Optional[str], last_modified: Optional[str],
+                      files: Optional[Iterable[str]]) -> None:
+    """Record the validators and extracted files of a feed directory; files is None for the whole archive."""
+    record = {
+        'etag': etag,
+        'last_modified': last_modified,
+        'files': sorted(files) if files is not None else None
+    }
+    with open(os.path.join(feed_dir, EXTRACTED_FEED_RECORD), 'wb') as f:
+        f.write(dumps_json(record, pretty=True))
+
+def _record_has_files(record: Optional[dict], feed_files: Optional[Iterable[str]]) -> bool:
+    """Whether an extracted feed holds every requested file (None requests the whole archive)."""
+    if record is None:
+        return False
+    if record.get('files') is None:
+        return True
+    return feed_files is not None and set(feed_files) <= set(record['files'])
 
-def download_feed_from_url(feed_url: str, output_dir: str = None, force_download: bool = False) -> Optional[str]:
+def _find_extracted_feed(cache_root: str, etag: Optional[str], last_modified: Optional[str],
+                         feed_files: Optional[Iterable[str]]) -> Optional[str]:
+    """Return an extracted feed directory with the response's validators and the requested files."""
+    if not (etag or last_modified) or not os.path.isdir(cache_root):
+        return None
+    for name in os.listdir(cache_root):
+        feed_dir = os.path.join(cache_root, name)
+        record = _load_feed_record(feed_dir)
+        if (record is not None and record.get('etag') == etag and record.get('last_modified') == last_modified
+                and _record_has_files(record, feed_files)):
+            return feed_dir
+    return None
+
+def _extract_to_cache(zip_ref: zipfile.ZipFile, feed_dir: str, feed_files: Optional[Iterable[str]],
+                      etag: Optional[str], last_modified: Optional[str]) -> None:
+    """
+    Extract the requested feed files that feed_dir does not hold yet.
+
+    Files already extracted are left untouched, so the parsed-file caches written next
+    to them stay valid. The record is written last, so an interrupted extraction is
+    redone by the next run.
+    """
+    record = _load_feed_record(feed_dir)
+    if record is None:
+        os.makedirs(feed_dir, exist_ok=True)
+        extracted = set()
+    elif record.get('files') is None:
+        extracted = None
+    else:
+        extracted = set(record['files'])
+
+    if extracted is None:
+        # The whole archive is already there
+        files = None
+    elif feed_files is None:
+        _extract_feed(zip_ref, feed_dir, [name for name in zip_ref.namelist() if name not in extracted])
+        files = None
+    else:
+        _extract_feed(zip_ref, feed_dir, set(feed_files) - extracted)
+        files = extracted | set(feed_files)
+    _save_feed_record(feed_dir, etag, last_modified, files)
+
+def _remove_other_extracted_feeds(cache_root: str, feed_dir: str) -> None:
+    """Remove the directories of earlier feed versions, which the next run cannot use."""
+    for name in os.listdir(cache_root):
+        path = os.path.join(cache_root, name)
+        if path != feed_dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+def remove_feed_directory(feed_dir: str) -> None:
+    """
+    Remove a feed directory this process extracted to the system temporary directory.
+
+    Feeds extracted under an output directory are kept, so the next run can reuse them.
+    """
+    if feed_dir in _temporary_feed_dirs:
+        shutil.rmtree(feed_dir, ignore_errors=True)
+        _temporary_feed_dirs.discard(feed_dir)
+        logger.info(f"Removed temporary feed directory: {feed_dir}")
+
+def download_feed_from_url(feed_url: str, output_dir: str = None, force_download: bool = False,
+                           feed_files: Optional[Iterable[str]] = None) -> Optional[str]:
     """
     Download GTFS feed from URL.
     
+    With an output_dir, the feed is extracted to <output_dir>/.feed_cache/<archive hash>/
+    and reused by later runs: a response with the validators of an extracted feed is
+    not downloaded again, and a downloaded archive that is already extracted is not
+    extracted again. Without one, it is extracted to a temporary directory that the
+    caller removes with remove_feed_directory.
+    
     Args:
         feed_url: URL to download the GTFS feed from
-        output_dir: Directory where reports will be written (used for metadata storage)
+        output_dir: Directory where reports will be written (used for metadata and the extracted feed)
         force_download: If True, skip conditional download checks
+        feed_files: Names of the feed files the caller reads; other members, such as a
+            large shapes.txt that a report never opens, are not extracted. None extracts all.
     
     Returns:
         Path to the directory containing the extracted GTFS files, or None if download was skipped
     """
     
-    # Check if we need to download the feed
+    # Send the stored validators on the GET itself, so an unchanged feed is answered
+    # with 304 without a separate HEAD round trip
+    headers = {}
     if not force_download and output_dir:
-        is_modified, cached_etag, cached_last_modified = _check_if_modified(feed_url, output_dir)
-        if not is_modified:
-            logger.info("Feed has not been modified, skipping download")
-            return None
-    
-    # Create a directory in the system temporary directory
-    temp_dir = tempfile.mkdtemp(prefix='gtfs_vigo_')
+        headers = _build_conditional_headers(_load_metadata(output_dir))
 
-    # Create a temporary zip file in the temporary directory
-    zip_filename = os.path.join(temp_dir, 'gtfs_vigo.zip')
+    cache_root = os.path.join(output_dir, EXTRACTED_FEEDS_DIR) if output_dir else None
 
-    headers = {}
-    response = requests.get(feed_url, headers=headers)
+    # Spool the archive in memory (spilling to disk only for very large feeds)
+    # instead of writing, re-reading and deleting an intermediate zip file
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        with _SESSION.get(feed_url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code == 304:
+                logger.info("Feed has not been modified (304 Not Modified), skipping download")
+                return None
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to download GTFS data: {response.status_code}")
+            if response.status_code != 200:
+                raise Exception(f"Failed to download GTFS data: {response.status_code}")
 
-    with open(zip_filename, 'wb') as file:
-        file.write(response.content)
-    
-    # Extract and save metadata if output_dir is provided
-    if output_dir:
-        etag = response.headers.get('ETag')
-        last_modified = response.headers.get('Last-Modified')
-        if etag or last_modified:
-            _save_metadata(output_dir, etag, last_modified)
-
-    # Extract the zip file
-    with zipfile.ZipFile(zip_filename, 'r') as zip_ref:
-        zip_ref.extractall(temp_dir)
-    
-    # Clean up the downloaded zip file
-    os.remove(zip_filename)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+            # A server that ignored the validators may still be sending an extracted version
+            if cache_root and not force_download:
+                feed_dir = _find_extracted_feed(cache_root, etag, last_modified, feed_files)
+                if feed_dir is not None:
+                    logger.info(f"Feed version is already extracted in {feed_dir}, skipping download")
+                    _save_metadata(output_dir, etag, last_modified)
+                    return feed_dir
+
+            # Hash the archive while it streams in, to name its extraction directory
+            archive_hash = hashlib.sha256()
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+                archive_hash.update(chunk)
+
+            # Extract and save metadata if output_dir is provided
+            if output_dir and (etag or last_modified):
+                _save_metadata(output_dir, etag, last_modified)
+
+        if cache_root:
+            feed_dir = os.path.join(cache_root, archive_hash.hexdigest()[:16])
+        else:
+            # Create a directory in the system temporary directory; it is removed
+            # after this run, so parsed data of its files is not cached
+            feed_dir = tempfile.mkdtemp(prefix='gtfs_vigo_')
+            _temporary_feed_dirs.add(feed_dir)
+            disable_feed_cache(feed_dir)
+
+        # Extract the zip file straight from the spooled download, removing a newly
+        # created directory if the archive turns out to be unreadable
+        try:
+            spool.seek(0)
+            with zipfile.ZipFile(spool, 'r') as zip_ref:
+                if cache_root:
+                    _extract_to_cache(zip_ref, feed_dir, feed_files, etag, last_modified)
+                else:
+                    _extract_feed(zip_ref, feed_dir, feed_files)
+        except BaseException:
+            if _load_feed_record(feed_dir) is None:
+                shutil.rmtree(feed_dir, ignore_errors=True)
+                _temporary_feed_dirs.discard(feed_dir)
+            raise
+
+    if cache_root:
+        _remove_other_extracted_feeds(cache_root, feed_dir)
 
-    logger.info(f"GTFS feed downloaded from {feed_url} and extracted to {temp_dir}")
+    logger.info(f"GTFS feed downloaded from {feed_url} and extracted to {feed_dir}")
 
-    return temp_dir
\ No newline at end of file
+    return feed_dir
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+On-disk cache for parsed GTFS feed files.
+
+Parsed data is stored as JSON in a cache directory next to the feed and keyed on
+the modification time and size of the source file, so a cache entry is only reused
+while the file it was parsed from is unchanged. Entries only ever hold plain data,
+so a cache file planted in the feed directory cannot run code when it is read. Feeds that are removed after a
+single run are marked with disable_feed_cache, and nothing is cached for them.
+"""
+import os
+import threading
+from typing import Any, Optional, Tuple
+from src.logger import get_logger
+from src.utils import dumps_json, loads_json
+
+logger = get_logger("feed_cache")
+
+FEED_CACHE_DIR = '.cache'
+# Marker file in a feed directory whose parsed data is not worth caching
+NO_CACHE_MARKER = '.nocache'
+
+
+def _cache_path(source_path: str, cache_name: str) -> str:
+    return os.path.join(os.path.dirname(source_path), FEED_CACHE_DIR, cache_name)
+
+
+def disable_feed_cache(feed_dir: str) -> None:
+    """Mark feed_dir so parsed data of its files is not cached, as no later run will read it."""
+    open(os.path.join(feed_dir, NO_CACHE_MARKER), 'wb').close()
+
+
+def is_feed_cache_disabled(feed_dir: str) -> bool:
+    """Whether feed_dir was marked by disable_feed_cache."""
+    return os.path.exists(os.path.join(feed_dir, NO_CACHE_MARKER))
+
+
+def get_source_key(source_path: str) -> Tuple[int, int]:
+    """Return the (mtime_ns, size) pair that identifies the current version of a feed file."""
+    stat = os.stat(source_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_feed_cache(source_path: str, cache_name: str) -> Optional[Any]:
+    """
+    Return the data cached for source_path, or None if there is no valid entry.
+
+    Entries are two JSON lines, the source key followed by the data, so a stale
+    entry is rejected after reading the key alone and its data is never parsed.
+
+    Args:
+        source_path: Path to the feed file the data was parsed from
+        cache_name: File name of the cache entry
+
+    Returns:
+        The cached data if it was written for the current version of source_path, otherwise None.
+    """
+    cache_path = _cache_path(source_path, cache_name)
+    try:
+        cache_key = get_source_key(source_path)
+        with open(cache_path, 'rb') as cache_file:
+            cached_key = loads_json(cache_file.readline())
+            if cached_key != list(cache_key):
+                return None
+            return loads_json(cache_file.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable feed cache {cache_path}: {e}")
+        return None
+
+
+def write_feed_cache(source_path: str, cache_name: str, data: Any) -> None:
+    """
+    Cache data parsed from source_path; failures only cost the next run a re-parse.
+
+    Args:
+        source_path: Path to the feed file the data was parsed from
+        cache_name: File name of the cache entry
+        data: Parsed data made of JSON types (tuples are stored as lists)
+    """
+    if is_feed_cache_disabled(os.path.dirname(source_path)):
+        return
+    cache_path = _cache_path(source_path, cache_name)
+    # Unique per writer, as report generators may parse the same file concurrently
+    temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        cache_key = get_source_key(source_path)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, 'wb') as cache_file:
+            # Compact JSON has no newlines, so the key is the first line
+            cache_file.write(dumps_json(list(cache_key)) + b'\n')
+            cache_file.write(dumps_json(data))
+        os.replace(temp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write feed cache {cache_path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
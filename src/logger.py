@@ -2,53 +2,69 @@
 Logging configuration for the GTFS application.
 """
 import logging
+import sys
 from colorama import init, Fore, Style
 
-# Initialize Colorama (required on Windows)
-init(autoreset=True)
+LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Colour prefix for each log level
+LEVEL_PREFIXES = {
+    logging.DEBUG: Style.DIM + Fore.WHITE,  # "Dark grey"
+    logging.INFO: Fore.CYAN,
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Style.BRIGHT + Fore.RED,
+}
 
 class ColorFormatter(logging.Formatter):
-    def format(self, record: logging.LogRecord):
-        # Base format
-        log_format = "%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s"
-
-        # Apply colors based on log level
-        if record.levelno == logging.DEBUG:
-            prefix = Style.DIM + Fore.WHITE  # "Dark grey"
-        elif record.levelno == logging.INFO:
-            prefix = Fore.CYAN
-        elif record.levelno == logging.WARNING:
-            prefix = Fore.YELLOW
-        elif record.levelno == logging.ERROR:
-            prefix = Fore.RED
-        elif record.levelno == logging.CRITICAL:
-            prefix = Style.BRIGHT + Fore.RED
-        else:
-            prefix = ""
+    def __init__(self):
+        super().__init__(LOG_FORMAT, LOG_DATE_FORMAT)
+        # One formatter per level, built once instead of for every record
+        self._formatters = {
+            level: logging.Formatter(prefix + LOG_FORMAT + Style.RESET_ALL, LOG_DATE_FORMAT)
+            for level, prefix in LEVEL_PREFIXES.items()
+        }
+        self._default_formatter = logging.Formatter(LOG_FORMAT + Style.RESET_ALL, LOG_DATE_FORMAT)
 
+    def format(self, record: logging.LogRecord):
         # Add color to the entire line
-        formatter = logging.Formatter(
-            prefix + log_format + Style.RESET_ALL, "%Y-%m-%d %H:%M:%S")
-        return formatter.format(record)
+        return self._formatters.get(record.levelno, self._default_formatter).format(record)
+
+_configured = False
+
+def configure_logging() -> None:
+    """Install the console handler on the root logger, once per process."""
+    global _configured
+    if _configured:
+        return
+    use_colour = sys.stderr.isatty()
+    if use_colour:
+        # Initialize Colorama (required on Windows) before the handler takes the
+        # stream; piped or redirected output skips the stream wrapper entirely
+        init(autoreset=True)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.DEBUG)
+    if use_colour:
+        console_handler.setFormatter(ColorFormatter())
+    else:
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+    logging.getLogger().addHandler(console_handler)
+    _configured = True
 
 def get_logger(name: str) -> logging.Logger:
     """
     Create and return a logger with the given name.
-    
+
+    Records propagate to the single handler installed on the root logger.
+
     Args:
         name (str): The name of the logger.
-        
+
     Returns:
         logging.Logger: Configured logger instance.
     """
+    configure_logging()
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-
-    # Only add handler if it doesn't already have one
-    if not logger.handlers:
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-        console_handler.setFormatter(ColorFormatter())
-        logger.addHandler(console_handler)
-        
     return logger
@@ -4,26 +4,28 @@ This module contains the main business logic for generating different types of r
 separated from CLI parsing and main script concerns.
 """
 import os
-import json
 import multiprocessing
 from datetime import datetime as dt, timedelta
-from typing import List, Dict, Any, Optional
-from multiprocessing import Pool, cpu_count
+from typing import List, Dict, Any, Iterable, Optional
+from multiprocessing import cpu_count
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 
 from .download import download_feed_from_url
 from .logger import get_logger
 from .common import get_all_feed_dates, date_range
 from .stops import get_all_stops
 from .services import get_active_services
-from .trips import get_trips_for_services
-from .stop_times import get_stops_for_trips
-from .routes import load_routes
+from .trips import get_trips_for_services, get_trip_ids
+from .stop_times import get_stops_for_trips, load_stop_times
+from .routes import load_routes, get_route_order, assign_route_info
 from .report_data import get_service_report_data_legacy
 from .report_render import render_html_report
-from .report_writer import write_service_html, write_index_json, render_and_write_html
-from .shapes import load_shapes, shapes_to_geojson
+from .report_writer import write_index_json, render_and_write_html, render_and_write_html_many, write_json_file, write_bytes_file, write_encoded_feature_collection
+from .shapes import load_shape_coordinates, shape_to_feature
 from .street_name import get_street_name
-from .utils import create_stop_id_to_code_mapping, time_to_seconds, normalize_gtfs_time
+from .utils import create_stop_id_to_code_mapping, time_to_seconds, normalize_gtfs_time, dumps_json, process_pool_context
 from .rolling_dates import create_rolling_date_config, RollingDateConfig
 
 # Service extractor imports
@@ -33,6 +35,17 @@ from .service_extractor.vgo_muni import VgoMunicipalServiceExtractor
 
 logger = get_logger("orchestrators")
 
+# Number of threads used to write individual shape GeoJSON files
+SHAPE_WRITER_THREADS = min(32, (os.cpu_count() or 1) * 4)
+
+# Service pages prepared before they are rendered, bounding the page data held in memory
+SERVICE_PAGE_BATCH = 1024
+
+# Feed files read by each report, so downloads only extract what a run needs
+SERVICE_REPORT_FEED_FILES = frozenset({'calendar.txt', 'calendar_dates.txt', 'routes.txt', 'stops.txt', 'stop_times.txt', 'trips.txt'})
+STOP_REPORT_FEED_FILES = SERVICE_REPORT_FEED_FILES
+GEOJSON_FEED_FILES = frozenset({'shapes.txt'})
+
 
 def get_service_extractor_class(extractor_name: str):
     """Get the appropriate service extractor class."""
@@ -45,16 +58,21 @@ def get_service_extractor_class(extractor_name: str):
 
 
 def prepare_feed_directory(feed_dir: Optional[str], feed_url: Optional[str], 
-                          output_dir: str, force_download: bool = False) -> Optional[str]:
+                          output_dir: str, force_download: bool = False,
+                          feed_files: Optional[Iterable[str]] = None) -> Optional[str]:
     """
     Prepare the feed directory by downloading if necessary.
     
+    Args:
+        feed_files: Feed files the caller reads (see SERVICE_REPORT_FEED_FILES and friends);
+            a downloaded feed only has these extracted. None extracts every file.
+    
     Returns:
         Path to the feed directory, or None if download was skipped
     """
     if feed_url:
         logger.info(f"Downloading GTFS feed from {feed_url}...")
-        feed_dir = download_feed_from_url(feed_url, output_dir, force_download)
+        feed_dir = download_feed_from_url(feed_url, output_dir, force_download, feed_files)
         if feed_dir is None:
             logger.info("Download was skipped (feed not modified).")
             return None
@@ -72,13 +90,66 @@ def get_date_list(all_dates: bool, start_date: Optional[str],
         return all_feed_dates
     else:
         end_date = end_date or start_date
-        return list(date_range(start_date, end_date))
+        return date_range(start_date, end_date)
+
+
+def load_service_trips(feed_dir: str, query_dates, routes: Dict[str, Any]):
+    """
+    Load the services, trips and stop times needed to report on a set of dates.
+
+    Shared by the orchestrator and service_report.py, so both read each feed file
+    once per run instead of once per date.
+
+    Args:
+        feed_dir: Path to the feed directory
+        query_dates: Dates whose active services are needed
+        routes: Routes as returned by load_routes, used to set route info on the trips
+
+    Returns:
+        Tuple of (active services by date, trips by service, position of each service
+        in the trips, stop times by trip)
+    """
+    # Active services per queried date, read once and reused by the date loop
+    active_by_date: dict[str, list[str]] = {}
+    unique_services: set[str] = set()
+    for query_date in query_dates:
+        date_services = get_active_services(feed_dir, query_date)
+        active_by_date[query_date] = date_services
+        unique_services.update(date_services)
+    
+    all_trips = get_trips_for_services(feed_dir, list(unique_services))
+    # One flat list of trip ids, used for both the trip count and the stop times lookup
+    all_trip_ids = get_trip_ids(all_trips)
+    logger.info(f"Loaded {len(all_trip_ids)} trips for all services.")
+    # Route names and colours do not depend on the date, so set them on the trips once
+    assign_route_info(all_trips, routes)
+    # Position of each service in all_trips, used to keep per-date trips in feed order
+    service_positions = {service_id: position for position, service_id in enumerate(all_trips)}
+    
+    # Load all stop times once
+    all_stops_for_trips = get_stops_for_trips(feed_dir, all_trip_ids)
+    logger.info(f"Loaded stop times for {len(all_stops_for_trips)} trips.")
+    return active_by_date, all_trips, service_positions, all_stops_for_trips
+
+
+def select_trips_for_services(all_trips: Dict[str, list], service_positions: Dict[str, int],
+                              active_services: List[str]) -> Dict[str, list]:
+    """
+    Pick the trips of a date's active services out of the preloaded trips.
+
+    Looks up only the active services and keeps the trips.txt service order of all_trips.
+    """
+    active_trip_services = sorted((service_id for service_id in set(active_services) if service_id in all_trips),
+                                  key=service_positions.__getitem__)
+    return {service_id: all_trips[service_id] for service_id in active_trip_services}
 
 
 def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
                                         all_dates_flag: bool, start_date: Optional[str],
                                         end_date: Optional[str], service_extractor: str,
-                                        rolling_dates_config_path: Optional[str] = None) -> Dict[str, Any]:
+                                        rolling_dates_config_path: Optional[str] = None,
+                                        dates: Optional[List[str]] = None,
+                                        jobs: int = 0) -> Dict[str, Any]:
     """
     Orchestrate the generation of service reports.
     
@@ -90,6 +161,8 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
     
     Args:
         rolling_dates_config_path: Optional path to rolling dates JSON configuration file
+        dates: Precomputed date list (see get_date_list); skips reading the feed's dates again
+        jobs: Number of processes used to render trip pages (0 for auto-detection)
     
     Returns:
         Dictionary with generation statistics and data
@@ -103,9 +176,12 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
     
     # Get service extractor class
     service_extractor_class = get_service_extractor_class(service_extractor)
+    # Service ids repeat across dates, so parse each one only once per run
+    extract_actual_service_id = lru_cache(maxsize=None)(service_extractor_class.extract_actual_service_id_from_identifier)
+    extract_service_name = lru_cache(maxsize=None)(service_extractor_class.extract_service_name_from_identifier)
     
-    # Get date list
-    date_list = get_date_list(all_dates_flag, start_date, end_date, feed_dir)
+    # Get date list, unless the caller already computed it
+    date_list = list(dates) if dates is not None else get_date_list(all_dates_flag, start_date, end_date, feed_dir)
     
     # Add all rolling dates from config to date_list
     if rolling_config.has_mappings():
@@ -129,11 +205,12 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
     
     routes = load_routes(feed_dir)
     logger.info(f"Loaded {len(routes)} routes from feed.")
+    # Day index line order, computed once instead of re-reading routes.txt per date
+    route_order = get_route_order(routes)
     
     # Pre-load all trips for performance
     # Include both actual dates AND source dates for rolling dates
     logger.info("Loading all trips data...")
-    all_services = []
     dates_to_query = set()
     
     for date in date_list:
@@ -142,25 +219,14 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
         if source_date:
             # This is a rolling date, we need services from the source date
             dates_to_query.add(source_date)
-            logger.debug(f"Date {date} is rolling, will query services from {source_date}")
+            logger.debug("Date %s is rolling, will query services from %s", date, source_date)
         else:
             # Normal date, query its own services
             dates_to_query.add(date)
     
     logger.info(f"Querying services for {len(dates_to_query)} unique dates (including source dates for rolling dates)")
     
-    for query_date in dates_to_query:
-        date_services = get_active_services(feed_dir, query_date)
-        all_services.extend(date_services)
-    
-    unique_services = list(dict.fromkeys(all_services))
-    all_trips = get_trips_for_services(feed_dir, unique_services)
-    logger.info(f"Loaded {sum(len(trips) for trips in all_trips.values())} trips for all services.")
-    
-    # Load all stop times once
-    all_trip_ids = [trip.trip_id for trip_list in all_trips.values() for trip in trip_list]
-    all_stops_for_trips = get_stops_for_trips(feed_dir, all_trip_ids)
-    logger.info(f"Loaded stop times for {len(all_stops_for_trips)} trips.")
+    active_by_date, all_trips, service_positions, all_stops_for_trips = load_service_trips(feed_dir, dates_to_query, routes)
     
     # Set generation timestamp once for all reports
     generated_at = dt.now()
@@ -170,7 +236,9 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
     trips_dir = os.path.join(output_dir, "trips")
     os.makedirs(trips_dir, exist_ok=True)
     
-    generated_trip_count = 0
+    trip_pages = []
+    trip_page_ids = []
+    queued_trip_paths = set()
     for service_id, trip_list in all_trips.items():
         for trip in trip_list:
             try:
@@ -178,9 +246,10 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
                 trip_detail_filename = f"trips/{trip_id}.html"
                 trip_detail_path = os.path.join(output_dir, trip_detail_filename)
                 
-                # Skip if trip file already exists (avoid duplicates)
-                if os.path.exists(trip_detail_path):
+                # Skip if trip file already exists or is already queued (avoid duplicates)
+                if trip_detail_path in queued_trip_paths or os.path.exists(trip_detail_path):
                     continue
+                queued_trip_paths.add(trip_detail_path)
                 
                 # Gather stop sequence and times for this trip
                 stops_for_trip = all_stops_for_trips.get(trip_id, [])
@@ -218,29 +287,90 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
                     "date": "various",  # Since trip spans multiple dates
                     "route_short_name": route_short_name,
                     "route_color": route_color,
-                    "shape_id": getattr(trip, "shape_id", None),
+                    "shape_id": trip.shape_id,
                     "stop_sequence": stop_sequence,
                     "generated_at": generated_at
                 }
                 
-                # Render trip detail page
-                render_and_write_html(
-                    "trip_detail.html.j2",
-                    trip_detail_data,
-                    trip_detail_path
-                )
-                
-                generated_trip_count += 1
+                trip_pages.append((trip_detail_data, trip_detail_path))
+                trip_page_ids.append(trip_id)
                 
             except Exception as e:
                 logger.error(f"Error generating trip detail page for trip {trip_id}: {e}")
     
+    # Render trip detail pages; rendering is CPU-bound and runs on worker processes
+    generated_trip_count = 0
+    for trip_id, error in zip(trip_page_ids, render_and_write_html_many("trip_detail.html.j2", trip_pages, jobs)):
+        if error is None:
+            generated_trip_count += 1
+        else:
+            logger.error(f"Error generating trip detail page for trip {trip_id}: {error}")
+    
     logger.info(f"Generated {generated_trip_count} unique trip HTML files.")
     
     # Process each date
     all_generated_dates = []
     services_by_date = {}
     
+    # Service pages are rendered in batches on worker processes like the trip pages;
+    # each date's index is written once its pages are done, without the failed ones
+    service_pages = []
+    service_page_ids = []
+    pending_dates = []
+    
+    def flush_service_pages():
+        results = render_and_write_html_many("service.html.j2", service_pages, jobs)
+        failed_paths = set()
+        for service_id, (_, file_path), error in zip(service_page_ids, service_pages, results):
+            if error is not None:
+                logger.error(f"Error processing service {service_id}: {error}")
+                failed_paths.add(file_path)
+        
+        for current_date, date_dir, generated_services, is_rolling, source_date in pending_dates:
+            if failed_paths:
+                generated_services = [service_data for service_data in generated_services
+                                      if os.path.join(date_dir, service_data["filename"]) not in failed_paths]
+            
+            # Generate day index for this date
+            try:
+                # Compute unique lines for filter buttons
+                unique_day_lines = []
+                seen_lines = set()
+                for service_data in generated_services:
+                    for line in service_data.get("lines", []):
+                        name = line.get("short_name")
+                        color = line.get("color")
+                        if name and name not in seen_lines:
+                            seen_lines.add(name)
+                            unique_day_lines.append({"name": name, "color": color})
+                
+                # Sort lines by order in routes.txt
+                unique_day_lines.sort(key=lambda ln: route_order.get(ln['name'], len(route_order)))
+                
+                # Write per-date index
+                render_and_write_html(
+                    "day_index.html.j2",
+                    {
+                        "date": current_date, 
+                        "services": generated_services, 
+                        "day_lines": unique_day_lines, 
+                        "generated_at": generated_at,
+                        "is_rolling_date": is_rolling,
+                        "source_date": source_date if is_rolling else None
+                    },
+                    os.path.join(date_dir, "index.html")
+                )
+                logger.info(f"Generated day index for {current_date}")
+            except Exception as e:
+                logger.error(f"Error generating day index for {current_date}: {e}")
+            
+            all_generated_dates.append(current_date)
+            services_by_date[current_date] = generated_services
+        
+        service_pages.clear()
+        service_page_ids.clear()
+        pending_dates.clear()
+    
     for current_date in date_list:
         logger.info(f"Processing service report for date {current_date}")
         
@@ -254,50 +384,36 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
         else:
             date_for_query = current_date
         
-        active_services = get_active_services(feed_dir, date_for_query)
+        active_services = active_by_date[date_for_query]
         if not active_services:
             logger.info("No active services found for the given date.")
             continue
         
         logger.info(f"Found {len(active_services)} active services for date {date_for_query}.")
         
-        # Filter pre-loaded trips by active services for this date
-        trips = {service_id: trip_list for service_id, trip_list in all_trips.items()
-                if service_id in active_services}
+        trips = select_trips_for_services(all_trips, service_positions, active_services)
         
-        # For now, use a simplified approach that generates HTML per service
-        # (This maintains compatibility with existing write_service_html function)
         generated_services = []
+        date_dir = os.path.join(output_dir, current_date)
         
         for service_id, trip_list in trips.items():
             try:
                 # Extract service information
                 try:
-                    actual_service_id = service_extractor_class.extract_actual_service_id_from_identifier(service_id)
+                    actual_service_id = extract_actual_service_id(service_id)
                 except Exception as e:
                     logger.warning(f"Failed to extract actual service id for {service_id}: {e}")
                     actual_service_id = service_id
                 
                 try:
-                    service_name = service_extractor_class.extract_service_name_from_identifier(service_id)
+                    service_name = extract_service_name(service_id)
                 except Exception as e:
                     logger.warning(f"Failed to extract service name for {service_id}: {e}")
                     service_name = service_id
                 
-                # Add route information to trips
-                for trip in trip_list:
-                    route_info = routes.get(trip.route_id)
-                    if route_info:
-                        trip.route_short_name = route_info['route_short_name']
-                        trip.route_color = route_info['route_color']
-                    else:
-                        logger.warning(f"Route ID {trip.route_id} not found in routes data.")
-                
                 # Generate and write service HTML
                 # Create proper filename and path
                 filename = f"{actual_service_id}.html"
-                date_dir = os.path.join(output_dir, current_date)
-                os.makedirs(date_dir, exist_ok=True)
                 file_path = os.path.join(date_dir, filename)
                 
                 # Prepare extra data
@@ -309,60 +425,57 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
                 }
                 
                 # Filter stops for trips for this service
+                service_trip_ids = {trip.trip_id for trip in trip_list}
                 stops_for_service_trips = {trip_id: stops for trip_id, stops in all_stops_for_trips.items() 
-                                         if any(trip.trip_id == trip_id for trip in trip_list)}
+                                         if trip_id in service_trip_ids}
                 
-                write_service_html(file_path, feed_dir, actual_service_id, trip_list, current_date, 
-                                 stops_for_service_trips, extra_data, stops)
+                # Prepare the page now and render it later with the rest of the batch
+                page_data = get_service_report_data_legacy(feed_dir, actual_service_id, trip_list, current_date,
+                                                           stops_for_service_trips, stops)
+                page_data.update(extra_data)
+                service_pages.append((page_data, file_path))
+                service_page_ids.append(service_id)
                 
-                # Collect route information with consecutive trip counts in sequence
+                # Collect route information with consecutive trip counts in sequence, and the
+                # first departure and last arrival times, in a single pass over the trips
                 service_routes = []
-                if trip_list:
-                    # Group consecutive trips with the same route
-                    current_route = None
-                    current_count = 0
-                    
-                    for trip in trip_list:
-                        route_info = routes.get(trip.route_id, {})
-                        route_short_name = route_info.get('route_short_name', trip.route_id)
-                        route_color = route_info.get('route_color', '0074d9')
-                        
-                        if current_route is None or current_route['short_name'] != route_short_name:
-                            # New route or different route, save previous if exists
-                            if current_route is not None:
-                                service_routes.append(current_route)
-                            
-                            # Start new route group
-                            current_route = {
-                                "short_name": route_short_name,
-                                "color": route_color,
-                                "count": 1
-                            }
-                        else:
-                            # Same route as previous, increment count
-                            current_count += 1
-                            current_route["count"] += 1
-                    
-                    # Don't forget to add the last route
-                    if current_route is not None:
-                        service_routes.append(current_route)
-                
-                # Calculate first departure and last arrival times
                 first_departure = None
                 last_arrival = None
-                if trip_list:
-                    # Get all stop times for this service's trips
-                    all_times = []
-                    for trip in trip_list:
-                        trip_stops = stops_for_service_trips.get(trip.trip_id, [])
-                        if trip_stops:
-                            all_times.extend([stop.departure_time for stop in trip_stops if stop.departure_time])
-                            all_times.extend([stop.arrival_time for stop in trip_stops if stop.arrival_time])
+                # Group consecutive trips with the same route
+                current_route = None
+                
+                for trip in trip_list:
+                    route_info = routes.get(trip.route_id, {})
+                    route_short_name = route_info.get('route_short_name', trip.route_id)
+                    route_color = route_info.get('route_color', '0074d9')
+                    
+                    if current_route is None or current_route['short_name'] != route_short_name:
+                        # New route or different route, save previous if exists
+                        if current_route is not None:
+                            service_routes.append(current_route)
+                        
+                        # Start new route group
+                        current_route = {
+                            "short_name": route_short_name,
+                            "color": route_color,
+                            "count": 1
+                        }
+                    else:
+                        # Same route as previous, increment count
+                        current_route["count"] += 1
                     
-                    if all_times:
-                        all_times.sort()
-                        first_departure = all_times[0]
-                        last_arrival = all_times[-1]
+                    # Earliest and latest of all the service's departure and arrival times
+                    for stop in stops_for_service_trips.get(trip.trip_id, ()):
+                        for stop_time in (stop.departure_time, stop.arrival_time):
+                            if stop_time:
+                                if first_departure is None or stop_time < first_departure:
+                                    first_departure = stop_time
+                                if last_arrival is None or stop_time > last_arrival:
+                                    last_arrival = stop_time
+                
+                # Don't forget to add the last route
+                if current_route is not None:
+                    service_routes.append(current_route)
                 
                 generated_services.append({
                     "service_id": actual_service_id,
@@ -377,49 +490,11 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
             except Exception as e:
                 logger.error(f"Error processing service {service_id}: {e}")
         
-        # Generate day index for this date
-        try:
-            # Compute unique lines for filter buttons
-            unique_day_lines = []
-            seen_lines = set()
-            for service_data in generated_services:
-                for line in service_data.get("lines", []):
-                    name = line.get("short_name")
-                    color = line.get("color")
-                    if name and name not in seen_lines:
-                        seen_lines.add(name)
-                        unique_day_lines.append({"name": name, "color": color})
-            
-            # Sort lines by order in routes.txt
-            import csv
-            try:
-                routes_path = os.path.join(feed_dir, 'routes.txt')
-                with open(routes_path, encoding='utf-8') as rf:
-                    reader = csv.DictReader(rf)
-                    order = [row.get('route_short_name', '') for row in reader]
-            except Exception:
-                order = [ln['name'] for ln in unique_day_lines]
-            unique_day_lines.sort(key=lambda ln: order.index(ln['name']) if ln['name'] in order else len(order))
-            
-            # Write per-date index
-            render_and_write_html(
-                "day_index.html.j2",
-                {
-                    "date": current_date, 
-                    "services": generated_services, 
-                    "day_lines": unique_day_lines, 
-                    "generated_at": generated_at,
-                    "is_rolling_date": is_rolling,
-                    "source_date": source_date if is_rolling else None
-                },
-                os.path.join(date_dir, "index.html")
-            )
-            logger.info(f"Generated day index for {current_date}")
-        except Exception as e:
-            logger.error(f"Error generating day index for {current_date}: {e}")
-        
-        all_generated_dates.append(current_date)
-        services_by_date[current_date] = generated_services
+        pending_dates.append((current_date, date_dir, generated_services, is_rolling, source_date))
+        if len(service_pages) >= SERVICE_PAGE_BATCH:
+            flush_service_pages()
+    
+    flush_service_pages()
     
     logger.info(f"Service report generation completed for {len(all_generated_dates)} dates")
     
@@ -452,18 +527,114 @@ def generate_service_reports_orchestrator(feed_dir: str, output_dir: str,
     return {
         'generated_dates': all_generated_dates,
         'services_by_date': services_by_date,
-        'total_services': len(unique_services),
-        'total_trips': len(all_trip_ids)
+        'total_services': len(set().union(*active_by_date.values())),
+        'total_trips': sum(len(trip_list) for trip_list in all_trips.values())
+    }
+
+
+@lru_cache(maxsize=4)
+def _load_stop_feed_data(feed_dir: str, numeric_stop_code: bool):
+    """
+    Load the date-independent feed data used by process_stop_date once per process.
+    
+    Every arrival needs its stop's code and street name, and the streets of the stops
+    after it, so these are looked up once per stop here instead of once per arrival.
+    
+    Returns:
+        Tuple of (routes by route_id, stop_id to (stop_code, street name) for stops with
+        a code, stop_id to street name for stops with a name).
+    """
+    stops = get_all_stops(feed_dir)
+    routes = load_routes(feed_dir)
+    stop_id_to_code = create_stop_id_to_code_mapping(stops, numeric_stop_code)
+    stop_meta = {
+        stop_id: (stop_code, get_street_name(stops[stop_id].stop_name))
+        for stop_id, stop_code in stop_id_to_code.items()
     }
+    stop_streets = {stop_id: get_street_name(stop.stop_name) for stop_id, stop in stops.items() if stop.stop_name}
+    return routes, stop_meta, stop_streets
+
+
+# Consecutive dates query each other's services (a date and the one before it), and
+# rolling dates share their source date's, so keep recent lookups per process
+@lru_cache(maxsize=64)
+def _get_stop_date_services(feed_dir: str, date: str) -> List[str]:
+    return get_active_services(feed_dir, date)
+
+
+@lru_cache(maxsize=8)
+def _get_stop_date_trips(feed_dir: str, service_ids: frozenset) -> Dict[str, list]:
+    return get_trips_for_services(feed_dir, service_ids)
+
+
+# Stop times table handed to each pool worker by _init_stop_worker
+_worker_stop_times: Optional[Dict[str, list]] = None
+
+
+def _init_stop_worker(feed_dir: str, numeric_stop_code: bool, stop_times: Optional[Dict[str, list]]) -> None:
+    """Pool initializer: load the static feed data and keep the stop times table loaded by the parent."""
+    global _worker_stop_times
+    _load_stop_feed_data(feed_dir, numeric_stop_code)
+    _worker_stop_times = stop_times
+
+
+def build_stop_arrivals(records: List[tuple], rolling_date: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Build the JSON arrival dictionaries for one stop from process_stop_date records.
+    
+    Args:
+        records: Arrival records of one stop, as returned by process_stop_date
+        rolling_date: source_date/target_date metadata added to each arrival of a rolling date
+    
+    Returns:
+        List of arrival dictionaries in the records' order
+    """
+    arrivals = []
+    for _, line, trip, departure_time, arrival_time, stop_sequence, shape_dist_traveled, next_streets in records:
+        line_name, line_colour = line
+        trip_id, service_id, headsign, direction_id, route_id = trip
+        arrival_data = {
+            'line': {
+                'name': line_name,
+                'colour': line_colour
+            },
+            'trip': {
+                'id': trip_id,
+                'service_id': service_id,
+                'headsign': headsign,
+                'direction_id': direction_id
+            },
+            'route_id': route_id,
+            'departure_time': departure_time,  # Use normalized time
+            'arrival_time': arrival_time,      # Use normalized time
+            'stop_sequence': stop_sequence,
+            'shape_dist_traveled': shape_dist_traveled,
+            'next_streets': next_streets
+        }
+        
+        # Add rolling date metadata if applicable
+        if rolling_date:
+            arrival_data['_rolling_date'] = dict(rolling_date)
+        
+        arrivals.append(arrival_data)
+    return arrivals
 
 
-def process_stop_date(args):
+def process_stop_date(args, stop_times: Optional[Dict[str, list]] = None):
     """
     Process a single date for stop reports, including next-day trips from previous date.
     
-    Note: When using rolling dates, multiple target dates may share the same source date.
-    Due to multiprocessing, each call loads data independently. For sequential processing
-    (jobs=1), consider implementing caching if processing many rolling dates with the same source.
+    Static feed data, active services and trips are cached per process, so dates handled
+    by the same process (including rolling dates sharing a source date) reuse them.
+    Stop times come from stop_times (see load_stop_times) when given, and are otherwise
+    read for the date's trips only.
+    
+    Arrivals are returned as compact tuples sorted by arrival time, with the line and
+    trip fields shared by every arrival of a trip; build_stop_arrivals turns one stop's
+    records into the JSON dictionaries when it is written.
+    
+    Returns:
+        Tuple of (target_date, stop_code to list of arrival records)
     """
     feed_dir, target_date, numeric_stop_code, source_date = args
     
@@ -476,18 +647,17 @@ def process_stop_date(args):
     else:
         logger.info(f"Processing stop data for date {target_date}")
     
-    stops = get_all_stops(feed_dir)
-    routes = load_routes(feed_dir)
+    routes, stop_meta, stop_streets = _load_stop_feed_data(feed_dir, numeric_stop_code)
     
     # Get active services for current date (or source date if rolling)
-    active_services = get_active_services(feed_dir, date_for_query)
+    active_services = _get_stop_date_services(feed_dir, date_for_query)
     
     # Get active services for previous date (for next-day trips)
     try:
         date_obj = dt.strptime(date_for_query, '%Y-%m-%d')
         prev_date_obj = date_obj - timedelta(days=1)
         prev_date = prev_date_obj.strftime('%Y-%m-%d')
-        prev_active_services = get_active_services(feed_dir, prev_date)
+        prev_active_services = _get_stop_date_services(feed_dir, prev_date)
     except (ValueError, TypeError):
         logger.warning(f"Could not parse date {date_for_query} for previous date calculation")
         prev_active_services = []
@@ -501,25 +671,13 @@ def process_stop_date(args):
     
     logger.info(f"Date {target_date}: {len(active_services)} current services, {len(prev_active_services)} prev services, {len(all_services)} total")
     
-    trips = get_trips_for_services(feed_dir, all_services)
-    all_trip_ids = [trip.trip_id for trip_list in trips.values() for trip in trip_list]
-    stops_for_all_trips = get_stops_for_trips(feed_dir, all_trip_ids)
-    
-    # Create stop_id to stop_code mapping using utility function
-    stop_id_to_code = create_stop_id_to_code_mapping(stops, numeric_stop_code)
+    trips = _get_stop_date_trips(feed_dir, frozenset(all_services))
+    all_trip_ids = get_trip_ids(trips)
+    stops_for_all_trips = get_stops_for_trips(feed_dir, all_trip_ids, stop_times)
     
     # Organize data by stop_code
     stop_arrivals = {}
     
-    # Store metadata for rolling dates
-    metadata = {}
-    if is_rolling:
-        metadata = {
-            'is_rolling_date': True,
-            'source_date': source_date,
-            'target_date': target_date
-        }
-    
     for service_id, trip_list in trips.items():
         # Determine if this service is for current date or next-day from previous date
         is_current_date_service = service_id in active_services
@@ -529,8 +687,12 @@ def process_stop_date(args):
             route_info = routes.get(trip.route_id, {})
             route_short_name = route_info.get('route_short_name', '')
             route_color = route_info.get('route_color', '')
+            line = (route_short_name, f"#{route_color}" if route_color and not route_color.startswith('#') else route_color or "#0074d9")
+            trip_fields = (trip.trip_id, service_id, getattr(trip, 'headsign', '') or '', getattr(trip, 'direction_id', 0), trip.route_id)
             
             trip_stops = stops_for_all_trips.get(trip.trip_id, [])
+            # Street of each stop in the trip (None for unnamed stops), for next_streets
+            trip_streets = [stop_streets.get(stop_time.stop_id) for stop_time in trip_stops]
             
             for i, stop_time in enumerate(trip_stops):
                 # Normalize arrival and departure times
@@ -550,82 +712,92 @@ def process_stop_date(args):
                 if not belongs_to_current_date:
                     continue
                 
-                stop_id = stop_time.stop_id
-                stop_code = stop_id_to_code.get(stop_id)
-                
-                if not stop_code:
+                # Stop code and street name of the current stop
+                meta = stop_meta.get(stop_time.stop_id)
+                if meta is None:
                     continue
+                stop_code, stop_street_name = meta
                 
                 if stop_code not in stop_arrivals:
                     stop_arrivals[stop_code] = []
                 
-                # Get stop information
-                stop_info = stops.get(stop_id)
-                if not stop_info:
-                    continue
-                
-                stop_name = stop_info.stop_name
-                stop_lat = stop_info.stop_lat
-                stop_lon = stop_info.stop_lon
-                
-                # Extract street name from current stop
-                stop_street_name = get_street_name(stop_name)
-                
-                # Get remaining stops in trip to generate next_streets
-                remaining_stops = trip_stops[i+1:]  # All stops after current one
+                # Streets of the remaining stops in the trip, in order and without repeats
                 next_streets = []
-                for remaining_stop in remaining_stops:
-                    remaining_stop_info = stops.get(remaining_stop.stop_id)
-                    if remaining_stop_info and remaining_stop_info.stop_name:
-                        street = get_street_name(remaining_stop_info.stop_name)
-                        if street not in next_streets and street != stop_street_name:
-                            next_streets.append(street)
-                
-                arrival_data = {
-                    'line': {
-                        'name': route_short_name,
-                        'colour': f"#{route_color}" if route_color and not route_color.startswith('#') else route_color or "#0074d9"
-                    },
-                    'trip': {
-                        'id': trip.trip_id,
-                        'service_id': service_id,
-                        'headsign': getattr(trip, 'headsign', '') or '',
-                        'direction_id': getattr(trip, 'direction_id', 0)
-                    },
-                    'route_id': trip.route_id,
-                    'departure_time': departure_time,  # Use normalized time
-                    'arrival_time': arrival_time,      # Use normalized time
-                    'stop_sequence': stop_time.stop_sequence,
-                    'shape_dist_traveled': getattr(stop_time, 'shape_dist_traveled', 0),
-                    'next_streets': next_streets
-                }
+                for street in trip_streets[i+1:]:
+                    if street is not None and street not in next_streets and street != stop_street_name:
+                        next_streets.append(street)
                 
-                # Add rolling date metadata if applicable
-                if is_rolling:
-                    arrival_data['_rolling_date'] = {
-                        'source_date': source_date,
-                        'target_date': target_date
-                    }
-                
-                stop_arrivals[stop_code].append(arrival_data)
+                # Arrival seconds first, as the sort key
+                stop_arrivals[stop_code].append((
+                    time_to_seconds(arrival_time), line, trip_fields, departure_time, arrival_time,
+                    stop_time.stop_sequence, getattr(stop_time, 'shape_dist_traveled', 0), next_streets
+                ))
     
     # Sort arrivals by time for each stop
+    by_arrival_seconds = itemgetter(0)
     for stop_code in stop_arrivals:
-        stop_arrivals[stop_code].sort(key=lambda x: time_to_seconds(x['arrival_time']))
+        stop_arrivals[stop_code].sort(key=by_arrival_seconds)
     
     return target_date, stop_arrivals
 
 
+def write_stop_date(args, stop_times: Optional[Dict[str, list]] = None):
+    """
+    Process a single date for stop reports and write one JSON file per stop.
+    
+    Args:
+        args: Tuple of (process_stop_date arguments, output directory, pretty flag)
+        stop_times: Stop times table passed on to process_stop_date
+    
+    Returns:
+        Tuple of (target_date, number of stop files written)
+    """
+    stop_date_args, output_dir, pretty = args
+    source_date = stop_date_args[3]
+    date, stop_arrivals = process_stop_date(stop_date_args, stop_times)
+    if not stop_arrivals:
+        return date, 0
+    
+    # Create the stops directory for this date
+    date_dir = os.path.join(output_dir, "stops", date)
+    os.makedirs(date_dir, exist_ok=True)
+    
+    rolling_date = {'source_date': source_date, 'target_date': date} if source_date else None
+    
+    # Write individual JSON file for each stop
+    for stop_code, records in stop_arrivals.items():
+        # Normalize stop code for filename: remove non-numeric and leading zeros
+        normalized_code = ''.join(c for c in stop_code if c.isdigit())
+        if normalized_code:
+            normalized_code = str(int(normalized_code))  # Remove leading zeros
+        else:
+            normalized_code = stop_code  # Fallback if no digits found
+        
+        stop_filepath = os.path.join(date_dir, f"{normalized_code}.json")
+        
+        write_json_file(stop_filepath, build_stop_arrivals(records, rolling_date), pretty)
+    
+    logger.info(f"Written {len(stop_arrivals)} stop files for {date}")
+    return date, len(stop_arrivals)
+
+
+def _write_stop_date_worker(args):
+    """Run write_stop_date in a pool worker with the stop times set by _init_stop_worker."""
+    return write_stop_date(args, _worker_stop_times)
+
+
 def generate_stop_reports_orchestrator(feed_dir: str, output_dir: str,
                                      all_dates_flag: bool, start_date: Optional[str],
                                      end_date: Optional[str], numeric_stop_code: bool = False,
                                      jobs: int = 0, pretty: bool = False,
-                                     rolling_dates_config_path: Optional[str] = None) -> Dict[str, Any]:
+                                     rolling_dates_config_path: Optional[str] = None,
+                                     dates: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Orchestrate the generation of stop reports.
     
     Args:
         rolling_dates_config_path: Optional path to rolling dates JSON configuration file
+        dates: Precomputed date list (see get_date_list); skips reading the feed's dates again
     
     Returns:
         Dictionary with generation statistics
@@ -637,8 +809,8 @@ def generate_stop_reports_orchestrator(feed_dir: str, output_dir: str,
     if rolling_config.has_mappings():
         logger.info(f"Loaded rolling dates configuration with {len(rolling_config.get_all_mappings())} mappings")
     
-    # Get date list
-    date_list = get_date_list(all_dates_flag, start_date, end_date, feed_dir)
+    # Get date list, unless the caller already computed it
+    date_list = list(dates) if dates is not None else get_date_list(all_dates_flag, start_date, end_date, feed_dir)
     
     # Add all rolling dates from config to date_list
     if rolling_config.has_mappings():
@@ -694,52 +866,32 @@ def generate_stop_reports_orchestrator(feed_dir: str, output_dir: str,
     # Process dates in parallel
     all_stops_summary = {}
     
+    # Load the static feed data once here: sequential runs use it directly and
+    # forked workers inherit it instead of parsing the feed again
+    _load_stop_feed_data(feed_dir, numeric_stop_code)
+    # Several dates look up the same trips, so load every trip's stop times once and
+    # pass the table to each date; a single date only reads the trips it needs
+    stop_times = load_stop_times(feed_dir) if len(process_args) > 1 else None
+    
+    # Workers write their date's files and only return its stop count, so the
+    # arrivals are never sent back to this process or held for every date at once
+    write_args = [(args, output_dir, pretty) for args in process_args]
     if jobs == 1:
         # Sequential processing for debugging
-        results = [process_stop_date(args) for args in process_args]
+        results = [write_stop_date(args, stop_times) for args in write_args]
     else:
-        # Parallel processing
-        with Pool(processes=jobs) as pool:
-            results = pool.map(process_stop_date, process_args)
-    
-    # Write results and collect summary
-    for date, stop_arrivals in results:
-        if stop_arrivals:
-            # Create the stops directory for this date
-            date_dir = os.path.join(output_dir, "stops", date)
-            os.makedirs(date_dir, exist_ok=True)
-            
-            # Write individual JSON file for each stop
-            written_stops = 0
-            normalized_stop_codes = []
-            
-            for stop_code, arrivals in stop_arrivals.items():
-                # Normalize stop code for filename: remove non-numeric and leading zeros
-                normalized_code = ''.join(c for c in stop_code if c.isdigit())
-                if normalized_code:
-                    normalized_code = str(int(normalized_code))  # Remove leading zeros
-                else:
-                    normalized_code = stop_code  # Fallback if no digits found
-                
-                stop_filepath = os.path.join(date_dir, f"{normalized_code}.json")
-                
-                with open(stop_filepath, 'w', encoding='utf-8') as f:
-                    if pretty:
-                        json.dump(arrivals, f, ensure_ascii=False, indent=2)
-                    else:
-                        json.dump(arrivals, f, ensure_ascii=False, separators=(',', ':'))
-                
-                written_stops += 1
-                normalized_stop_codes.append(normalized_code)
-            
-            logger.info(f"Written {written_stops} stop files for {date}")
+        # Parallel processing; the initializer loads the data in workers that were not forked
+        # and gives every worker the parent's stop times table
+        with process_pool_context().Pool(processes=jobs, initializer=_init_stop_worker,
+                                         initargs=(feed_dir, numeric_stop_code, stop_times)) as pool:
+            results = list(pool.imap(_write_stop_date_worker, write_args))
     
     logger.info(f"Stop report generation completed for {len(results)} dates")
     
     return {
-        'generated_dates': [date for date, stop_arrivals in results if stop_arrivals],
+        'generated_dates': [date for date, stop_count in results if stop_count],
         'total_dates': len(date_list),
-        'total_stops': sum(len(stop_arrivals) for date, stop_arrivals in results)
+        'total_stops': sum(stop_count for date, stop_count in results)
     }
 
 
@@ -753,8 +905,8 @@ def generate_geojson_reports_orchestrator(feed_dir: str, output_dir: str,
     """
     logger.info("Starting GeoJSON shape generation...")
     
-    # Load shapes from the feed
-    shapes = load_shapes(feed_dir)
+    # Load shape coordinates from the feed
+    shapes = load_shape_coordinates(feed_dir)
     logger.info(f"Loaded {len(shapes)} shapes from feed")
     
     if not shapes:
@@ -765,49 +917,40 @@ def generate_geojson_reports_orchestrator(feed_dir: str, output_dir: str,
     shapes_dir = os.path.join(output_dir, "shapes")
     os.makedirs(shapes_dir, exist_ok=True)
     
-    # Convert to GeoJSON and write combined file
-    geojson_data = shapes_to_geojson(shapes)
-    
-    # Write the combined GeoJSON file
     combined_filepath = os.path.join(shapes_dir, "all_shapes.geojson")
-    with open(combined_filepath, 'w', encoding='utf-8') as f:
-        if pretty:
-            json.dump(geojson_data, f, ensure_ascii=False, indent=2)
-        else:
-            json.dump(geojson_data, f, ensure_ascii=False, separators=(',', ':'))
-    
-    logger.info(f"Written combined GeoJSON file: {combined_filepath}")
-    files_written = 1
-    
-    # Write individual shape files
     shape_ids = []
-    for shape_id, shape_points in shapes.items():
-        if not shape_points:
-            continue
-            
-        coordinates = [[point.shape_pt_lon, point.shape_pt_lat] for point in shape_points]
+    files_written = 0
+    
+    # Individual files are independent and I/O-bound, so write them on a thread pool
+    with ThreadPoolExecutor(max_workers=SHAPE_WRITER_THREADS) as executor:
+        write_futures = []
         
-        individual_geojson = {
-            "type": "Feature",
-            "properties": {
-                "shape_id": shape_id
-            },
-            "geometry": {
-                "type": "LineString",
-                "coordinates": coordinates
-            }
-        }
+        def iter_encoded_features():
+            # Single pass: build and encode each feature once, queue its individual
+            # file and hand the same bytes to the combined stream
+            for shape_id, coordinates in shapes.items():
+                if not coordinates:
+                    continue
+                
+                encoded = dumps_json(shape_to_feature(shape_id, coordinates), pretty)
+                
+                # Write individual file
+                individual_filepath = os.path.join(shapes_dir, f"{shape_id}.geojson")
+                write_futures.append(executor.submit(write_bytes_file, individual_filepath, encoded))
+                
+                shape_ids.append(shape_id)
+                yield encoded
         
-        # Write individual file
-        individual_filepath = os.path.join(shapes_dir, f"{shape_id}.geojson")
-        with open(individual_filepath, 'w', encoding='utf-8') as f:
-            if pretty:
-                json.dump(individual_geojson, f, ensure_ascii=False, indent=2)
-            else:
-                json.dump(individual_geojson, f, ensure_ascii=False, separators=(',', ':'))
+        # Stream the combined GeoJSON file so features are never collected in memory
+        write_encoded_feature_collection(combined_filepath, iter_encoded_features(), pretty)
         
-        shape_ids.append(shape_id)
-        files_written += 1
+        # Surface any individual write error before writing the index
+        for future in write_futures:
+            future.result()
+            files_written += 1
+    
+    logger.info(f"Written combined GeoJSON file: {combined_filepath}")
+    files_written += 1
     
     # Write shapes index
     index_filepath = os.path.join(shapes_dir, "index.json")
@@ -816,11 +959,7 @@ def generate_geojson_reports_orchestrator(feed_dir: str, output_dir: str,
         "count": len(shape_ids)
     }
     
-    with open(index_filepath, 'w', encoding='utf-8') as f:
-        if pretty:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
-        else:
-            json.dump(index_data, f, ensure_ascii=False, separators=(',', ':'))
+    write_json_file(index_filepath, index_data, pretty)
     
     files_written += 1
     logger.info(f"Written shape index with {len(shape_ids)} shapes to {index_filepath}")
@@ -168,6 +168,7 @@ def get_service_report_data_legacy(feed_dir: str, service_id: str, trips: List[T
     total_distance_km = 0
     total_trips = len(trips)
     trip_rows: list[dict[str, Any]] = []
+    last_arrival = None
 
     # Process each trip
     for trip in trips:
@@ -179,6 +180,9 @@ def get_service_report_data_legacy(feed_dir: str, service_id: str, trips: List[T
         if row:
             trip_rows.append(row)
             total_distance_km += distance_km
+            # Track the latest arrival while building rows instead of rescanning them
+            if last_arrival is None or row["last_arrival"] > last_arrival:
+                last_arrival = row["last_arrival"]
 
     # Sort trip rows by departure time
     trip_rows.sort(key=lambda x: time_to_minutes(x["first_arrival"]))
@@ -191,6 +195,8 @@ def get_service_report_data_legacy(feed_dir: str, service_id: str, trips: List[T
         "service_id": service_id,
         "date": date,
         "trip_rows": trip_rows,
+        "first_departure": trip_rows[0]["first_arrival"] if trip_rows else None,
+        "last_arrival": last_arrival,
         "total_distance": format_distance(total_distance_km),
         "total_trips": format_count(total_trips),
         "css_classes": css_classes_str
@@ -1,7 +1,8 @@
 """
 Handles Jinja2 HTML rendering for reports.
 """
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, Template
+from functools import lru_cache
 import os
 from typing import Dict, Any
 from datetime import datetime
@@ -28,8 +29,11 @@ def _get_template_env():
     
     return _template_env
 
+@lru_cache(maxsize=None)
+def get_compiled_template(template_name: str) -> Template:
+    """Load and compile a report template once per process."""
+    return _get_template_env().get_template(f"templates/{template_name}")
+
 def render_html_report(template_name: str, data: Dict[str, Any]) -> str:
     """Render HTML report with caching for better performance."""
-    env = _get_template_env()
-    template = env.get_template(f"templates/{template_name}")
-    return template.render(**data)
+    return get_compiled_template(template_name).render(**data)
@@ -2,19 +2,37 @@
 Report writers for various output formats (HTML, JSON).
 Centralizes all write operations for different report types.
 """
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from src.report_data import get_service_report_data_legacy
-from src.report_render import render_html_report
+from src.report_render import get_compiled_template, render_html_report
 from src.logger import get_logger
 from src.trips import TripLine
 from src.stop_times import StopTime
+from src.utils import dumps_json, process_pool_context
 import os
-import json
+
+logger = get_logger("report_writer")
+
+# Below this many pages, starting worker processes costs more than rendering serially
+PARALLEL_RENDER_MIN_PAGES = 64
+# Upper bound on the number of pages handed to a worker at once
+PARALLEL_RENDER_MAX_CHUNKSIZE = 256
+# Buffer size for streamed GeoJSON collections, which can reach tens of megabytes
+COLLECTION_WRITE_BUFFER = 1 << 20
+
+# Directories already created by this process; most pages share a handful of them
+_created_dirs: set = set()
+
+
+def _ensure_dir(directory: str) -> None:
+    """Create directory (and parents) unless this process already did so."""
+    if directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
 
 
 def write_service_html(filename: str, feed_dir: str, service_id: str, trips: List[TripLine], date: str, stops_for_trips: Dict[str, List[StopTime]], extra_data: Dict[str, Any] = None, stops: Dict[str, Any] = None) -> None:
-    logger = get_logger("report_writer")
-    
     try:
         # Prepare data, passing pre-loaded stops for performance
         data: dict[str, Any] = get_service_report_data_legacy(feed_dir, service_id, trips, date, stops_for_trips, stops)
@@ -26,11 +44,10 @@ def write_service_html(filename: str, feed_dir: str, service_id: str, trips: Lis
         html_output: str = render_html_report("service.html.j2", data)
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        _ensure_dir(os.path.dirname(filename))
         
-        # Write with buffered I/O for better performance
-        with open(filename, "w", encoding="utf-8", buffering=8192) as f:
-            f.write(html_output)
+        # Encode once and write the bytes in a single call, without a text wrapper
+        write_bytes_file(filename, html_output.encode("utf-8"))
     except Exception as e:
         logger.error(f"Error writing HTML report to {filename}: {e}")
         raise
@@ -45,25 +62,141 @@ def render_and_write_html(template_name: str, data: Dict[str, Any], output_path:
         data: Dictionary containing data to render in the template
         output_path: Path where the HTML file should be written
     """
-    logger = get_logger("report_writer")
-    
     try:
         # Render HTML using the template
         html_output = render_html_report(template_name, data)
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _ensure_dir(os.path.dirname(output_path))
         
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_output)
+        # Encode once and write the bytes in a single call, without a text wrapper
+        write_bytes_file(output_path, html_output.encode('utf-8'))
             
-        logger.debug(f"HTML report written to: {output_path}")
+        logger.debug("HTML report written to: %s", output_path)
     except Exception as e:
         logger.error(f"Error writing HTML report to {output_path}: {e}")
         raise
 
 
+def _render_and_write_task(task: Tuple[str, Dict[str, Any], str]) -> Optional[str]:
+    """Render and write a single page in a worker process, returning the error message if it failed."""
+    template_name, data, output_path = task
+    try:
+        render_and_write_html(template_name, data, output_path)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def render_and_write_html_many(template_name: str, pages: List[Tuple[Dict[str, Any], str]], jobs: int = 0) -> List[Optional[str]]:
+    """
+    Render many pages with the same template and write them to HTML files.
+    
+    Rendering is CPU-bound, so large batches are spread over worker processes.
+    The template is compiled before the workers start, so forked workers inherit
+    it instead of each compiling their own copy.
+    
+    Args:
+        template_name: Name of the Jinja2 template file
+        pages: List of (data, output_path) tuples
+        jobs: Number of worker processes (0 for one per CPU, 1 to render serially)
+    
+    Returns:
+        For each page, in order, None if it was written or the error message if it failed
+    """
+    tasks = [(template_name, data, output_path) for data, output_path in pages]
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    
+    if jobs == 1 or len(tasks) < PARALLEL_RENDER_MIN_PAGES:
+        return [_render_and_write_task(task) for task in tasks]
+    
+    get_compiled_template(template_name)
+    chunksize = max(1, min(PARALLEL_RENDER_MAX_CHUNKSIZE, len(tasks) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=process_pool_context()) as executor:
+        return list(executor.map(_render_and_write_task, tasks, chunksize=chunksize))
+
+
+def write_bytes_file(file_path: str, data: bytes) -> None:
+    """
+    Write already serialized data to a file in a single binary write.
+    
+    Uses the raw os.open/os.write calls: reports write thousands of small files,
+    and the buffered file object adds setup work and syscalls that are not needed
+    for one write of known size.
+    
+    Args:
+        file_path: Path of the file to write
+        data: Encoded file contents
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            # os.write may write less than requested for large buffers
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_json_file(file_path: str, data: Any, pretty: bool = False) -> None:
+    """
+    Serialize data to JSON and write it to a file in a single binary write.
+    
+    Args:
+        file_path: Path of the JSON file to write
+        data: JSON-serializable data
+        pretty: Whether to format JSON with indentation
+    """
+    write_bytes_file(file_path, dumps_json(data, pretty))
+
+
+def write_encoded_feature_collection(file_path: str, encoded_features: Iterable[bytes], pretty: bool = False) -> int:
+    """
+    Stream a GeoJSON FeatureCollection from features already encoded with dumps_json.
+    
+    The output is identical to write_json_file with the whole collection, but only
+    one serialized feature is held in memory at a time. Callers that also write each
+    feature to its own file serialize it only once.
+    
+    Args:
+        file_path: Path of the GeoJSON file to write
+        encoded_features: Iterable of features encoded with dumps_json(feature, pretty)
+        pretty: Whether the features were encoded with indentation
+    
+    Returns:
+        Number of features written
+    """
+    encoded_features = iter(encoded_features)
+    first = next(encoded_features, None)
+    if first is None:
+        write_json_file(file_path, {"type": "FeatureCollection", "features": []}, pretty)
+        return 0
+    
+    if pretty:
+        header, separator, footer = b'{\n  "type": "FeatureCollection",\n  "features": [\n', b',\n', b'\n  ]\n}'
+    else:
+        header, separator, footer = b'{"type":"FeatureCollection","features":[', b',', b']}'
+    
+    def nest(encoded: bytes) -> bytes:
+        if pretty:
+            # Nest the feature's own indentation two levels deeper
+            return b'    ' + encoded.replace(b'\n', b'\n    ')
+        return encoded
+    
+    count = 1
+    # Features arrive as many small writes, so batch them through a large buffer
+    with open(file_path, 'wb', buffering=COLLECTION_WRITE_BUFFER) as f:
+        f.write(header)
+        f.write(nest(first))
+        for encoded in encoded_features:
+            f.write(separator)
+            f.write(nest(encoded))
+            count += 1
+        f.write(footer)
+    return count
+
+
 def write_stop_json(output_dir: str, date: str, stop_code: str, arrivals: List[Dict[str, Any]], pretty: bool = False) -> None:
     """
     Write stop arrivals data to a JSON file.
@@ -75,21 +208,18 @@ def write_stop_json(output_dir: str, date: str, stop_code: str, arrivals: List[D
         arrivals: List of arrival dictionaries
         pretty: Whether to format JSON with indentation
     """
-    logger = get_logger("report_writer")
-    
     try:
         # Create the stops directory for this date
         date_dir = os.path.join(output_dir, "stops", date)
-        os.makedirs(date_dir, exist_ok=True)
+        # Called once per stop, so only the first stop of a date creates the directory
+        _ensure_dir(date_dir)
 
         # Create the JSON file
         file_path = os.path.join(date_dir, f"{stop_code}.json")
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(arrivals, f, indent=2 if pretty else None, separators=(
-                ",", ":") if not pretty else None, ensure_ascii=False)
+        write_json_file(file_path, arrivals, pretty)
                 
-        logger.debug(f"Stop JSON written to: {file_path}")
+        logger.debug("Stop JSON written to: %s", file_path)
     except Exception as e:
         logger.error(f"Error writing stop JSON to {output_dir}/stops/{date}/{stop_code}.json: {e}")
         raise
@@ -105,19 +235,13 @@ def write_index_json(output_dir: str, data: Dict[str, Any], filename: str = "ind
         filename: Name of the JSON file (default: "index.json")
         pretty: Whether to format JSON with indentation
     """
-    logger = get_logger("report_writer")
-    
     try:
         # Create the output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
         # Write the index.json file
         index_filepath = os.path.join(output_dir, filename)
-        with open(index_filepath, 'w', encoding='utf-8') as f:
-            if pretty:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            else:
-                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        write_json_file(index_filepath, data, pretty)
         
         logger.info(f"Index JSON written to: {index_filepath}")
     except Exception as e:
@@ -19,21 +19,32 @@ def load_routes(feed_dir: str) -> dict[str, dict[str, str]]:
     routes_file_path = os.path.join(feed_dir, 'routes.txt')
 
     try:
-        with open(routes_file_path, 'r', encoding='utf-8') as routes_file:
-            reader = csv.DictReader(routes_file)
-            header = reader.fieldnames or []
-            if 'route_color' not in header:
+        with open(routes_file_path, 'r', encoding='utf-8', newline='') as routes_file:
+            # Read rows positionally instead of building a dict per row
+            reader = csv.reader(routes_file)
+            header = next(reader, [])
+            for column in ('route_id', 'route_short_name'):
+                if column not in header:
+                    raise KeyError(column)
+            route_id_index = header.index('route_id')
+            short_name_index = header.index('route_short_name')
+            if 'route_color' in header:
+                color_index = header.index('route_color')
+            else:
+                color_index = None
                 logger.warning("Column 'route_color' not found in routes.txt. Defaulting to black (#000000).")
+            width = len(header)
 
             for row in reader:
-                route_id = row['route_id']
-                if 'route_color' in row and row['route_color']:
-                    route_color = row['route_color']
-                else:
-                    route_color = '000000'
-                routes[route_id] = {
-                    'route_short_name': row['route_short_name'],
-                    'route_color': route_color
+                if not row:
+                    continue
+                if len(row) < width:
+                    # Missing trailing fields read as None, like csv.DictReader
+                    row = row + [None] * (width - len(row))
+                route_color = row[color_index] if color_index is not None else None
+                routes[row[route_id_index]] = {
+                    'route_short_name': row[short_name_index],
+                    'route_color': route_color or '000000'
                 }
     except FileNotFoundError:
         raise FileNotFoundError(f"Routes file not found at {routes_file_path}")
@@ -41,3 +52,39 @@ def load_routes(feed_dir: str) -> dict[str, dict[str, str]]:
         raise KeyError(f"Missing required column in routes file: {e}")
 
     return routes
+
+
+def get_route_order(routes: dict[str, dict[str, str]]) -> dict[str, int]:
+    """
+    Map each route_short_name to its position in routes.txt.
+
+    Args:
+        routes: Routes as returned by load_routes, which keeps the file order.
+
+    Returns:
+        dict[str, int]: Position of the first route with each short name, for use as a sort key.
+    """
+    order: dict[str, int] = {}
+    for route_info in routes.values():
+        order.setdefault(route_info['route_short_name'], len(order))
+    return order
+
+
+def assign_route_info(trips: dict[str, list], routes: dict[str, dict[str, str]]) -> None:
+    """
+    Set route_short_name and route_color on every trip from its route.
+
+    Trips are shared between dates, so this only needs to run once after loading them.
+
+    Args:
+        trips: Trips grouped by service, as returned by get_trips_for_services.
+        routes: Routes as returned by load_routes.
+    """
+    for trip_list in trips.values():
+        for trip in trip_list:
+            route_info = routes.get(trip.route_id)
+            if route_info:
+                trip.route_short_name = route_info['route_short_name']
+                trip.route_color = route_info['route_color']
+            else:
+                logger.warning(f"Route ID {trip.route_id} not found in routes data.")
@@ -3,11 +3,16 @@ Functions for handling GTFS shapes data.
 """
 import os
 import csv
-from typing import List, Dict, Tuple, Optional
+from operator import attrgetter
+from typing import List, Dict, Optional
+from src.feed_cache import read_feed_cache, write_feed_cache
 from src.logger import get_logger
 
 logger = get_logger("shapes")
 
+# Parsed shapes are cached next to the feed so repeat runs skip the CSV parse
+SHAPES_CACHE_FILE = 'shapes.json'
+
 
 class ShapePoint:
     """
@@ -85,6 +90,96 @@ def load_shapes(feed_dir: str) -> Dict[str, List[ShapePoint]]:
     return shapes
 
 
+def load_shape_coordinates(feed_dir: str) -> Dict[str, List[List[float]]]:
+    """
+    Load shapes data from the GTFS feed as GeoJSON-ready coordinates.
+
+    Unlike load_shapes, no ShapePoint object is created per point: rows are read
+    positionally and only the (sequence, lon, lat) values are kept. The parsed
+    result is cached in the feed directory and reused while shapes.txt is unchanged.
+
+    Args:
+        feed_dir: Path to the GTFS feed directory
+
+    Returns:
+        Dictionary mapping shape_id to lists of [lon, lat] pairs, sorted by sequence.
+    """
+    shapes_file_path = os.path.join(feed_dir, 'shapes.txt')
+
+    if not os.path.exists(shapes_file_path):
+        logger.warning("shapes.txt file not found.")
+        return {}
+
+    coordinates = read_feed_cache(shapes_file_path, SHAPES_CACHE_FILE)
+    if coordinates is not None:
+        logger.info(f"Loaded {len(coordinates)} shapes from cache.")
+        return coordinates
+
+    coordinates = _parse_shape_coordinates(shapes_file_path)
+    if coordinates:
+        write_feed_cache(shapes_file_path, SHAPES_CACHE_FILE, coordinates)
+    return coordinates
+
+
+def _parse_shape_coordinates(shapes_file_path: str) -> Dict[str, List[List[float]]]:
+    """Parse shapes.txt into shape_id -> [lon, lat] pairs, sorted by sequence."""
+    coordinates: Dict[str, List[List[float]]] = {}
+    # Sequences are kept in a list parallel to each shape's coordinates, so points
+    # are built once in their output form and only reordered if the file has them
+    # out of sequence
+    sequences: Dict[str, List[int]] = {}
+    try:
+        with open(shapes_file_path, 'r', encoding='utf-8', newline='') as shapes_file:
+            reader = csv.reader(shapes_file)
+            header = next(reader, [])
+
+            required_columns = ['shape_id', 'shape_pt_lat', 'shape_pt_lon', 'shape_pt_sequence']
+            missing_columns = [col for col in required_columns if col not in header]
+            if missing_columns:
+                logger.error(f"Required columns not found in shapes.txt: {missing_columns}")
+                return coordinates
+
+            id_index = header.index('shape_id')
+            lat_index = header.index('shape_pt_lat')
+            lon_index = header.index('shape_pt_lon')
+            sequence_index = header.index('shape_pt_sequence')
+
+            for row in reader:
+                if not row:
+                    continue
+                shape_id = row[id_index]
+
+                try:
+                    sequence = int(row[sequence_index])
+                    point = [float(row[lon_index]), float(row[lat_index])]
+                except (ValueError, IndexError) as e:
+                    logger.warning(f"Error parsing shape data for shape {shape_id}: {e}")
+                    continue
+
+                shape_coordinates = coordinates.get(shape_id)
+                if shape_coordinates is None:
+                    shape_coordinates = coordinates[shape_id] = []
+                    sequences[shape_id] = []
+                shape_coordinates.append(point)
+                sequences[shape_id].append(sequence)
+
+        # Sort each shape's points by sequence, unless they are already in order
+        for shape_id, shape_sequences in sequences.items():
+            if any(a > b for a, b in zip(shape_sequences, shape_sequences[1:])):
+                shape_coordinates = coordinates[shape_id]
+                order = sorted(range(len(shape_sequences)), key=shape_sequences.__getitem__)
+                coordinates[shape_id] = [shape_coordinates[i] for i in order]
+
+        logger.info(f"Loaded {len(coordinates)} shapes from feed.")
+
+    except FileNotFoundError:
+        logger.warning("shapes.txt file not found.")
+    except Exception as e:
+        logger.error(f"Error loading shapes: {e}")
+
+    return coordinates
+
+
 def get_shape_for_trip(feed_dir: str, trip_id: str) -> Optional[str]:
     """
     Get the shape_id for a specific trip.
@@ -120,6 +215,29 @@ def get_shape_for_trip(feed_dir: str, trip_id: str) -> Optional[str]:
     return None
 
 
+def shape_to_feature(shape_id: str, coordinates: List[List[float]]) -> Dict:
+    """
+    Convert a single shape to a GeoJSON LineString feature.
+
+    Args:
+        shape_id: The shape ID
+        coordinates: List of [lon, lat] pairs, sorted by sequence
+
+    Returns:
+        GeoJSON Feature with the shape_id as its only property.
+    """
+    return {
+        "type": "Feature",
+        "properties": {
+            "shape_id": shape_id
+        },
+        "geometry": {
+            "type": "LineString",
+            "coordinates": coordinates
+        }
+    }
+
+
 def shapes_to_geojson(shapes: Dict[str, List[ShapePoint]]) -> Dict:
     """
     Convert shapes data to GeoJSON format.
@@ -130,25 +248,12 @@ def shapes_to_geojson(shapes: Dict[str, List[ShapePoint]]) -> Dict:
     Returns:
         GeoJSON FeatureCollection containing all shapes as LineString features.
     """
-    features = []
-    
-    for shape_id, shape_points in shapes.items():
-        if not shape_points:
-            continue
-            
-        coordinates = [[point.shape_pt_lon, point.shape_pt_lat] for point in shape_points]
-        
-        feature = {
-            "type": "Feature",
-            "properties": {
-                "shape_id": shape_id
-            },
-            "geometry": {
-                "type": "LineString",
-                "coordinates": coordinates
-            }
-        }
-        features.append(feature)
+    lon_lat = attrgetter('shape_pt_lon', 'shape_pt_lat')
+    features = [
+        shape_to_feature(shape_id, list(map(list, map(lon_lat, shape_points))))
+        for shape_id, shape_points in shapes.items()
+        if shape_points
+    ]
     
     return {
         "type": "FeatureCollection",
@@ -2,14 +2,22 @@
 Functions for handling GTFS stop_times data.
 """
 import os
+from src.feed_cache import read_feed_cache, write_feed_cache
 from src.logger import get_logger
 
 logger = get_logger("stop_times")
 
+# Parsed stop times are cached next to the feed so repeat runs skip the CSV parse
+STOP_TIMES_CACHE_FILE = 'stop_times.json'
+
 class StopTime:
     """
     Class representing a stop time entry in the GTFS data.
     """
+    # One instance per stop_times.txt row, so avoid a per-instance __dict__
+    __slots__ = ('trip_id', 'arrival_time', 'departure_time', 'stop_id', 'stop_sequence',
+                 'shape_dist_traveled', 'day_change')
+
     def __init__(self, trip_id: str, arrival_time: str, departure_time: str, stop_id: str, stop_sequence: int, shape_dist_traveled: float | None):
         self.trip_id = trip_id
         self.arrival_time = arrival_time
@@ -23,66 +31,148 @@ class StopTime:
         return f"StopTime({self.trip_id=}, {self.arrival_time=}, {self.departure_time=}, {self.stop_id=}, {self.stop_sequence=})"
 
 
-def get_stops_for_trips(feed_dir: str, trip_ids: list[str]) -> dict[str, list[StopTime]]:
+def get_stops_for_trips(feed_dir: str, trip_ids: list[str],
+                        stop_times: dict[str, list[StopTime]] | None = None) -> dict[str, list[StopTime]]:
     """
     Get stops for a list of trip IDs based on the 'stop_times.txt' file.
+
+    Without stop_times, StopTime objects are built for the requested trips only, from
+    the parsed-file cache while stop_times.txt is unchanged, and nothing is kept once
+    the call returns. Callers that look up trips for many dates instead load the
+    table once with load_stop_times and pass it in; the lists returned then belong
+    to that table.
     Args:
         trip_ids (list[str]): List of trip IDs to find stops for.
+        stop_times: Table returned by load_stop_times, or None to read the feed.
     Returns:
         dict[str, list[StopTime]]: Dictionary mapping trip IDs to lists of StopTime objects (ordered by stop_sequence).
     """
-    import csv
-    
-    stops: dict[str, list[StopTime]] = {}
     # Convert trip_ids to a set for O(1) lookup instead of O(n)
     trip_ids_set = set(trip_ids)
+    if stop_times is not None:
+        return {trip_id: trip_stops for trip_id, trip_stops in stop_times.items() if trip_id in trip_ids_set}
+
+    stop_times_path = os.path.join(feed_dir, 'stop_times.txt')
+    if not os.path.exists(stop_times_path):
+        logger.warning("stop_times.txt file not found.")
+        return {}
+
+    return {
+        trip_id: _build_stop_times(trip_id, trip_rows)
+        for trip_id, trip_rows in _load_stop_time_rows(stop_times_path).items()
+        if trip_id in trip_ids_set
+    }
+
+
+def load_stop_times(feed_dir: str) -> dict[str, list[StopTime]]:
+    """
+    Load the stop times of every trip, for callers that look up trips for many dates.
+
+    The table holds one StopTime per stop_times.txt row, so it is the largest piece of
+    feed data a report keeps in memory. Callers that spread dates over a process pool
+    load it once before starting the pool and hand it to the workers, which share the
+    parent's copy when forked and receive one pickled copy each otherwise.
+    Returns:
+        dict[str, list[StopTime]]: Dictionary mapping trip IDs to lists of StopTime objects (ordered by stop_sequence).
+    """
+    stop_times_path = os.path.join(feed_dir, 'stop_times.txt')
+    if not os.path.exists(stop_times_path):
+        logger.warning("stop_times.txt file not found.")
+        return {}
+
+    return {
+        trip_id: _build_stop_times(trip_id, trip_rows)
+        for trip_id, trip_rows in _load_stop_time_rows(stop_times_path).items()
+    }
+
+
+def _build_stop_times(trip_id: str, trip_rows: list) -> list[StopTime]:
+    """Build the StopTime objects of one trip from its parsed rows."""
+    return [StopTime(trip_id, *fields) for fields in trip_rows]
+
+
+def _load_stop_time_rows(stop_times_path: str) -> dict[str, list]:
+    """
+    Return the rows of stop_times.txt by trip, reusing the parsed-file cache while the file is unchanged.
+
+    Rows are (arrival_time, departure_time, stop_id, stop_sequence, shape_dist_traveled)
+    field lists sorted by stop_sequence, so the cache holds plain data.
+    """
+    all_rows = read_feed_cache(stop_times_path, STOP_TIMES_CACHE_FILE)
+    if all_rows is None:
+        all_rows = _parse_stop_times(stop_times_path)
+        if all_rows:
+            write_feed_cache(stop_times_path, STOP_TIMES_CACHE_FILE, all_rows)
+    return all_rows
+
+
+def _parse_stop_times(stop_times_path: str) -> dict[str, list[tuple]]:
+    """Parse stop_times.txt into trip_id -> row field tuples, sorted by stop_sequence."""
+    import csv
+    from operator import itemgetter
+    
+    stops: dict[str, list[tuple]] = {}
     
     try:
-        with open(os.path.join(feed_dir, 'stop_times.txt'), 'r', encoding="utf-8", newline='') as stop_times_file:
-            # Use csv.DictReader for better performance and cleaner code
-            reader = csv.DictReader(stop_times_file)
+        with open(stop_times_path, 'r', encoding="utf-8", newline='') as stop_times_file:
+            # Read rows positionally instead of building a dict per row
+            reader = csv.reader(stop_times_file)
+            header = next(reader, [])
             
             # Check for required columns
             required_columns = ['trip_id', 'arrival_time', 'departure_time', 'stop_id', 'stop_sequence']
-            missing_columns = [col for col in required_columns if col not in reader.fieldnames]
+            missing_columns = [col for col in required_columns if col not in header]
             if missing_columns:
                 logger.error(f"Required columns not found in header: {missing_columns}")
                 return stops
             
-            has_shape_dist = 'shape_dist_traveled' in reader.fieldnames
+            has_shape_dist = 'shape_dist_traveled' in header
             if not has_shape_dist:
                 logger.warning("Column 'shape_dist_traveled' not found in stop_times.txt. Distances will be set to None.")
             
+            trip_id_index = header.index('trip_id')
+            arrival_time_index = header.index('arrival_time')
+            departure_time_index = header.index('departure_time')
+            stop_id_index = header.index('stop_id')
+            stop_sequence_index = header.index('stop_sequence')
+            shape_dist_index = header.index('shape_dist_traveled') if has_shape_dist else None
+            width = len(header)
+            
             for row in reader:
-                trip_id = row['trip_id']
-                if trip_id in trip_ids_set:
-                    if trip_id not in stops:
-                        stops[trip_id] = []
-                    
-                    # Parse shape distance if available
-                    dist = None
-                    if has_shape_dist and row['shape_dist_traveled']:
-                        try:
-                            dist = float(row['shape_dist_traveled'])
-                        except ValueError:
-                            pass  # Keep dist as None if parsing fails
-                    
+                if not row:
+                    continue
+                if len(row) < width:
+                    # Missing trailing fields read as None, like csv.DictReader
+                    row = row + [None] * (width - len(row))
+                trip_id = row[trip_id_index]
+                trip_stops = stops.get(trip_id)
+                if trip_stops is None:
+                    trip_stops = stops[trip_id] = []
+                
+                # Parse shape distance if available
+                dist = None
+                if has_shape_dist and row[shape_dist_index]:
                     try:
-                        stops[trip_id].append(StopTime(
-                            trip_id=trip_id,
-                            arrival_time=row['arrival_time'],
-                            departure_time=row['departure_time'],
-                            stop_id=row['stop_id'],
-                            stop_sequence=int(row['stop_sequence']),
-                            shape_dist_traveled=dist
-                        ))
-                    except ValueError as e:
-                        logger.warning(f"Error parsing stop_sequence for trip {trip_id}: {e}")
-                        continue
+                        dist = float(row[shape_dist_index])
+                    except ValueError:
+                        pass  # Keep dist as None if parsing fails
+                
+                try:
+                    trip_stops.append((
+                        row[arrival_time_index],
+                        row[departure_time_index],
+                        row[stop_id_index],
+                        int(row[stop_sequence_index]),
+                        dist
+                    ))
+                except ValueError as e:
+                    logger.warning(f"Error parsing stop_sequence for trip {trip_id}: {e}")
+                    continue
         
         # Sort each trip's stops by stop_sequence
-        for trip_id in stops:
-            stops[trip_id].sort(key=lambda st: st.stop_sequence)
+        by_sequence = itemgetter(3)
+        for trip_stops in stops.values():
+            trip_stops.sort(key=by_sequence)
     except FileNotFoundError:
         logger.warning("stop_times.txt file not found.")
     return stops
@@ -7,7 +7,7 @@ from src.logger import get_logger
 logger = get_logger("stops")
 
 
-@dataclass
+@dataclass(slots=True)
 class Stop:
     stop_id: str
     stop_code: Optional[str]
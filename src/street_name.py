@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 
 re_remove_quotation_marks = re.compile(r'[""”]', re.IGNORECASE)
@@ -21,6 +22,8 @@ exception_streets = [
     "Estrada das Prantas"
 ]
 
+# Stop names repeat across stops and are looked up for every arrival
+@lru_cache(maxsize=65536)
 def get_street_name(original_name: str) -> str:
     original_name = re.sub(re_remove_quotation_marks, '', original_name).strip()
     match = re.match(re_anything_before_stopcharacters_with_parentheses, original_name)
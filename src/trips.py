@@ -2,14 +2,22 @@
 Functions for handling GTFS trip data.
 """
 import os
+from itertools import chain
+from operator import attrgetter
 from src.logger import get_logger
 
 logger = get_logger("trips")
 
+_trip_id = attrgetter('trip_id')
+
 class TripLine:
     """
     Class representing a trip line in the GTFS data.
     """
+    # Feeds have many trips, so avoid a per-instance __dict__
+    __slots__ = ('route_id', 'service_id', 'trip_id', 'headsign', 'direction_id', 'shape_id',
+                 'route_short_name', 'route_color', 'trip_detail_filename')
+
     def __init__(self, route_id: str, service_id: str, trip_id: str, headsign: str, direction_id: int, shape_id: str = None):
         self.route_id = route_id
         self.service_id = service_id
@@ -19,11 +27,25 @@ class TripLine:
         self.shape_id = shape_id
         self.route_short_name = ""
         self.route_color = ""
+        self.trip_detail_filename = None  # Set once the trip's detail page is written
 
     def __str__(self):
         return f"TripLine({self.route_id=}, {self.service_id=}, {self.trip_id=}, {self.headsign=}, {self.direction_id=}, {self.shape_id=})"
 
 
+def get_trip_ids(trips: dict[str, list[TripLine]]) -> list[str]:
+    """
+    Flatten trips grouped by service into their trip IDs, in service then trip order.
+
+    Args:
+        trips (dict[str, list[TripLine]]): Trips as returned by get_trips_for_services.
+
+    Returns:
+        list[str]: The trip ID of every trip.
+    """
+    return list(map(_trip_id, chain.from_iterable(trips.values())))
+
+
 def get_trips_for_services(feed_dir: str, service_ids: list[str]) -> dict[str, list[TripLine]]:
     """
     Get trips for a list of service IDs based on the 'trips.txt' file.
@@ -1,8 +1,17 @@
 """
 Common utility functions used across the GTFS report generators.
 """
+import json
+import multiprocessing
+import threading
+from functools import lru_cache
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard library encoder is used instead
+    orjson = None
+
 
 def normalize_stop_code(stop_code: str, numeric_only: bool = False) -> str:
     """Normalize stop code based on formatting requirements."""
@@ -29,11 +38,24 @@ def create_stop_id_to_code_mapping(stops: Dict[str, Any], numeric_stop_code: boo
     return stop_id_to_code
 
 
+# Stop times repeat across trips and a service day has at most 86400 distinct
+# HH:MM:SS values (plus the post-midnight ones), so the time parsers are memoised
+TIME_CACHE_SIZE = 1 << 17
+
+
+@lru_cache(maxsize=TIME_CACHE_SIZE)
 def time_to_seconds(time_str: str) -> int:
     """Convert HH:MM:SS to seconds since midnight."""
     if not time_str:
         return 0
     
+    # Fixed-width HH:MM:SS is by far the most common form, so slice it without splitting
+    if len(time_str) == 8 and time_str[2] == ':' and time_str[5] == ':':
+        try:
+            return int(time_str[0:2]) * 3600 + int(time_str[3:5]) * 60 + int(time_str[6:8])
+        except ValueError:
+            pass  # Fall back to the general parse below
+    
     parts = time_str.split(':')
     if len(parts) != 3:
         return 0
@@ -45,6 +67,7 @@ def time_to_seconds(time_str: str) -> int:
         return 0
 
 
+@lru_cache(maxsize=TIME_CACHE_SIZE)
 def normalize_gtfs_time(time_str: str) -> tuple[str, bool]:
     """
     Normalize GTFS time and determine if it's a next-day trip.
@@ -85,8 +108,14 @@ def seconds_to_time(seconds: int) -> str:
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
+@lru_cache(maxsize=None)
 def safe_color_hex(color: str) -> str:
-    """Ensure color is a valid 6-character hex code."""
+    """
+    Ensure color is a valid 6-character hex code.
+
+    Called for every trip row, but a feed only has a handful of route colours,
+    so each distinct value is validated once.
+    """
     if not color:
         return "cccccc"
     
@@ -109,4 +138,45 @@ def format_distance(distance_km: float) -> str:
 
 def format_count(count: int) -> str:
     """Format count with consistent number formatting."""
-    return f"{count:,}"
\ No newline at end of file
+    return f"{count:,}"
+
+
+def process_pool_context():
+    """
+    Return the multiprocessing context for report worker pools.
+
+    Forking while other threads are running can deadlock the child on a lock one of
+    them held, as when the unified generator builds report types on threads, so the
+    workers are started from a forkserver (or spawned) then. Otherwise the platform
+    default is kept, so forked workers still inherit the data loaded by the parent.
+    """
+    if threading.active_count() > 1:
+        start_methods = multiprocessing.get_all_start_methods()
+        return multiprocessing.get_context('forkserver' if 'forkserver' in start_methods else 'spawn')
+    return multiprocessing.get_context()
+
+
+def fork_is_safe() -> bool:
+    """Whether worker processes can be forked: fork is available and no other thread is running."""
+    return 'fork' in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def dumps_json(data: Any, pretty: bool = False) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON bytes.
+
+    Uses orjson when it is installed and the standard library encoder otherwise.
+    Compact output contains no whitespace; pretty output is indented with two spaces.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads_json(data: bytes) -> Any:
+    """Deserialize UTF-8 encoded JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
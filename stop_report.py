@@ -1,34 +1,40 @@
 import os
-import shutil
 import sys
 import traceback
 import argparse
-import json
+from functools import lru_cache
+from operator import itemgetter
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import multiprocessing
 from multiprocessing import Pool, cpu_count
 
-from src.download import download_feed_from_url
+from src.cli_parser import iso_date
+from src.download import download_feed_from_url, remove_feed_directory
 from src.logger import get_logger
-from src.common import get_all_feed_dates, date_range, time_to_seconds
-from src.stops import get_all_stops
+from src.orchestrators import STOP_REPORT_FEED_FILES
+from src.common import get_all_feed_dates, date_range
+from src.stops import Stop, get_all_stops
 from src.services import get_active_services
 from src.street_name import get_street_name
-from src.trips import get_trips_for_services
-from src.stop_times import get_stops_for_trips
+from src.trips import get_trips_for_services, get_trip_ids
+from src.stop_times import StopTime, get_stops_for_trips, load_stop_times
 from src.routes import load_routes
 from src.report_writer import write_stop_json, write_index_json
+from src.utils import time_to_seconds
 
 logger = get_logger("stop_report")
 
+# Number of tasks a worker process handles before being replaced
+WORKER_MAX_TASKS = 64
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Generate stop-based JSON reports for a date or date range.")
-    parser.add_argument('--start-date', type=str,
+    parser.add_argument('--start-date', type=iso_date,
                         help='Start date (YYYY-MM-DD)')
-    parser.add_argument('--end-date', type=str,
+    parser.add_argument('--end-date', type=iso_date,
                         help='End date (YYYY-MM-DD, inclusive)')
     parser.add_argument('--all-dates', action='store_true',
                         help='Process all dates in the feed')
@@ -41,7 +47,7 @@ def parse_args():
     parser.add_argument('--numeric-stop-code', action='store_true',
                         help="Strip non-numeric characters from stop codes (e.g., 'P001400' becomes '1400')")
     parser.add_argument('--pretty', action='store_true',
-                        help="Pretty-print JSON output (default is compact JSON without spaces)")
+                        help="Pretty-print JSON output, for debugging (default is minified JSON)")
     parser.add_argument('--jobs', type=int, default=0,
                         help="Number of parallel processes to use (default: 0). Set to 0 for automatic detection.")
     parser.add_argument('--force-download', action='store_true', 
@@ -63,16 +69,45 @@ def parse_args():
     return args
 
 
-def time_to_seconds(time_str: str) -> int:
-    """Convert HH:MM:SS to seconds since midnight."""
-    parts = time_str.split(':')
-    if len(parts) != 3:
-        return 0
+@lru_cache(maxsize=None)
+def _load_static_feed_data(
+    feed_dir: str,
+    numeric_stop_code: bool
+) -> tuple[Dict[str, Stop], Dict[str, Dict[str, str]], Dict[str, str]]:
+    """
+    Load the date-independent feed data once per process.
+
+    Returns:
+        Tuple of (stops by stop_id, routes by route_id, stop_id to stop_code lookup).
+    """
+    stops = get_all_stops(feed_dir)
+    logger.info(f"Found {len(stops)} stops in the feed.")
+
+    # Load routes information
+    routes = load_routes(feed_dir)
+    logger.info(f"Loaded {len(routes)} routes from feed.")
+
+    # Create a reverse lookup from stop_id to stop_code
+    stop_id_to_code = {}
+    for stop_id, stop in stops.items():
+        if stop.stop_code:
+            stop_code = stop.stop_code
+            # Apply numeric-only transformation if requested
+            if numeric_stop_code:
+                # First strip non-numeric characters
+                numeric_code = ''.join(c for c in stop_code if c.isdigit())
+                # Then convert to integer and back to string to remove leading zeros
+                stop_code = str(int(numeric_code)) if numeric_code else ""
+            stop_id_to_code[stop_id] = stop_code
+
+    return stops, routes, stop_id_to_code
+
 
 def get_stop_arrivals(
     feed_dir: str,
         date: str,
-        numeric_stop_code: bool = False
+        numeric_stop_code: bool = False,
+        stop_times: Optional[Dict[str, List[StopTime]]] = None
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Process trips for the given date and organize stop arrivals.
@@ -81,12 +116,12 @@ def get_stop_arrivals(
         feed_dir: Path to the GTFS feed directory
         date: Date in YYYY-MM-DD format
         numeric_stop_code: If True, strip non-numeric characters from stop codes
+        stop_times: Stop times of every trip from load_stop_times, or None to read the date's trips only
 
     Returns:
         Dictionary mapping stop_code to lists of arrival information.
     """
-    stops = get_all_stops(feed_dir)
-    logger.info(f"Found {len(stops)} stops in the feed.")
+    stops, routes, stop_id_to_code = _load_static_feed_data(feed_dir, numeric_stop_code)
 
     active_services = get_active_services(feed_dir, date)
     if not active_services:
@@ -97,34 +132,14 @@ def get_stop_arrivals(
         f"Found {len(active_services)} active services for date {date}.")
 
     trips = get_trips_for_services(feed_dir, active_services)
-    total_trip_count = sum(len(trip_list) for trip_list in trips.values())
-    logger.info(f"Found {total_trip_count} trips for active services.")
-
-    # Get all trip IDs
-    all_trip_ids = [trip.trip_id for trip_list in trips.values()
-                    for trip in trip_list]
+    # Get all trip IDs, which also gives the trip count
+    all_trip_ids = get_trip_ids(trips)
+    logger.info(f"Found {len(all_trip_ids)} trips for active services.")
 
     # Get stops for all trips
-    stops_for_all_trips = get_stops_for_trips(feed_dir, all_trip_ids)
+    stops_for_all_trips = get_stops_for_trips(feed_dir, all_trip_ids, stop_times)
     logger.info(f"Precomputed stops for {len(stops_for_all_trips)} trips.")
 
-    # Load routes information
-    routes = load_routes(feed_dir)
-    logger.info(f"Loaded {len(routes)} routes from feed.")
-
-    # Create a reverse lookup from stop_id to stop_code
-    stop_id_to_code = {}
-    for stop_id, stop in stops.items():
-        if stop.stop_code:
-            stop_code = stop.stop_code
-            # Apply numeric-only transformation if requested
-            if numeric_stop_code:
-                # First strip non-numeric characters
-                numeric_code = ''.join(c for c in stop_code if c.isdigit())
-                # Then convert to integer and back to string to remove leading zeros
-                stop_code = str(int(numeric_code)) if numeric_code else ""
-            stop_id_to_code[stop_id] = stop_code
-
     # Organize data by stop_code
     stop_arrivals = {}
 
@@ -137,6 +152,12 @@ def get_stop_arrivals(
 
             # Get stop times for this trip
             trip_stops = stops_for_all_trips.get(trip.trip_id, [])
+            # Street of each stop in the trip, looked up once per trip rather than
+            # again for every earlier stop that lists it among its next streets
+            trip_streets = []
+            for trip_stop_time in trip_stops:
+                trip_stop = stops.get(trip_stop_time.stop_id)
+                trip_streets.append(get_street_name(trip_stop.stop_name if trip_stop else "N/A"))
 
             for i, stop_time in enumerate(trip_stops):
                 stop_id = stop_time.stop_id
@@ -148,27 +169,16 @@ def get_stop_arrivals(
                 if stop_code not in stop_arrivals:
                     stop_arrivals[stop_code] = []
 
-                # Get stop information
-                stop = stops.get(stop_id)
-                stop_name = stop.stop_name if stop else "Unknown Stop"
-
-                next_stop_names = []
-                if i < len(trip_stops) - 1:
-                    for next_stop_time in trip_stops[i+1:]:
-                        next_stop = stops.get(next_stop_time.stop_id)
-                        next_stop_names.append(next_stop.stop_name if next_stop else "N/A")
-
                 next_streets = []
                 _street_cursor = None
-                for stop_name in next_stop_names:
-                    street_name = get_street_name(stop_name)
+                for street_name in trip_streets[i+1:]:
                     if _street_cursor != street_name:
                         next_streets.append(street_name)
                         _street_cursor = street_name
 
                 # Convert times to seconds for sorting
                 arrival_seconds = time_to_seconds(stop_time.arrival_time)
-                stop_arrivals[stop_code].append({
+                stop_arrivals[stop_code].append((arrival_seconds, {
                     "line": {
                         "name": route_short_name,
                         "colour": f"#{route_color}" if route_color else "#FFFFFF",
@@ -185,17 +195,15 @@ def get_stop_arrivals(
                     "stop_sequence": stop_time.stop_sequence,
                     "shape_dist_traveled": stop_time.shape_dist_traveled,
                     "next_streets": next_streets,
-                    "arrival_seconds": arrival_seconds,
-                })
+                }))
 
-    # Sort each stop's arrivals by arrival time
-    for stop_code in stop_arrivals:
+    # Sort each stop's arrivals by arrival time, kept as the first item of each pair
+    by_arrival_seconds = itemgetter(0)
+    for stop_code, pairs in stop_arrivals.items():
         # Filter out entries with None arrival_seconds
-        stop_arrivals[stop_code] = [item for item in stop_arrivals[stop_code] if item["arrival_seconds"] is not None]
-        stop_arrivals[stop_code].sort(key=lambda x: x["arrival_seconds"])
-        # Remove the temporary sorting key
-        for item in stop_arrivals[stop_code]:
-            item.pop("arrival_seconds", None)
+        pairs = [pair for pair in pairs if pair[0] is not None]
+        pairs.sort(key=by_arrival_seconds)
+        stop_arrivals[stop_code] = [arrival for _, arrival in pairs]
 
     return stop_arrivals
 
@@ -205,7 +213,8 @@ def process_date(
     date: str,
     output_dir: str,
     numeric_stop_code: bool,
-    pretty: bool
+    pretty: bool,
+    stop_times: Optional[Dict[str, List[StopTime]]] = None
 ) -> tuple[str, Dict[str, int]]:
     """
     Process a single date and write its stop JSON files.
@@ -217,7 +226,7 @@ def process_date(
 
         # Get all stop arrivals for the current date
         stop_arrivals = get_stop_arrivals(
-            feed_dir, date, numeric_stop_code
+            feed_dir, date, numeric_stop_code, stop_times
         )
 
         if not stop_arrivals:
@@ -239,6 +248,23 @@ def process_date(
         raise
 
 
+# Per-worker (feed_dir, output_dir, numeric_stop_code, pretty, stop_times), set once by _init_worker
+_WORKER_CONTEXT: Optional[tuple] = None
+
+
+def _init_worker(feed_dir: str, output_dir: str, numeric_stop_code: bool, pretty: bool,
+                 stop_times: Optional[Dict[str, List[StopTime]]]) -> None:
+    """Store the arguments shared by every task so only the date is sent per task."""
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = (feed_dir, output_dir, numeric_stop_code, pretty, stop_times)
+
+
+def _process_date_worker(date: str) -> tuple[str, Dict[str, int]]:
+    """Process a single date in a pool worker using the context set by _init_worker."""
+    feed_dir, output_dir, numeric_stop_code, pretty, stop_times = _WORKER_CONTEXT
+    return process_date(feed_dir, date, output_dir, numeric_stop_code, pretty, stop_times)
+
+
 def main():
     args = parse_args()
     output_dir = args.output_dir
@@ -251,7 +277,7 @@ def main():
         feed_dir = args.feed_dir
     else:
         logger.info(f"Downloading GTFS feed from {feed_url}...")
-        feed_dir = download_feed_from_url(feed_url, output_dir, args.force_download)
+        feed_dir = download_feed_from_url(feed_url, output_dir, args.force_download, STOP_REPORT_FEED_FILES)
         if feed_dir is None:
             logger.info("Download was skipped (feed not modified). Exiting.")
             return
@@ -265,7 +291,7 @@ def main():
     else:
         start_date = args.start_date
         end_date = args.end_date or args.start_date
-        date_list = list(date_range(start_date, end_date))
+        date_list = date_range(start_date, end_date)
 
     # Ensure date_list is not empty before processing
     if not date_list:
@@ -280,42 +306,47 @@ def main():
     # Dictionary to store summary data for index files
     all_stops_summary = {}
 
+    # Every date looks up the same trips, so load their stop times once here; forked
+    # workers, including the ones that replace recycled workers, share this copy
+    stop_times = load_stop_times(feed_dir) if len(date_list) > 1 else None
+
     if jobs > 1 and len(date_list) > 1:
         # Parallel processing
         try:
-            with Pool(processes=jobs) as pool:
-                tasks = [
-                    (feed_dir, date, output_dir,
-                     numeric_stop_code, pretty)
-                    for date in date_list
-                ]
-                results = pool.starmap(process_date, tasks)
-
-                for date, stop_summary in results:
+            # Recycle workers periodically so their memory does not grow over long date lists
+            with Pool(processes=jobs, maxtasksperchild=WORKER_MAX_TASKS,
+                      initializer=_init_worker,
+                      initargs=(feed_dir, output_dir, numeric_stop_code, pretty, stop_times)) as pool:
+                chunksize = max(1, len(date_list) // (jobs * 4))
+                # Consume results as they complete so fast dates don't wait on slow ones
+                for date, stop_summary in pool.imap_unordered(_process_date_worker, date_list, chunksize=chunksize):
                     all_stops_summary[date] = stop_summary
         except Exception as e:
             logger.error(f"Error in parallel processing: {e}")
-            # Fallback to sequential processing
+            # Fallback to sequential processing for the dates that did not complete
             for date in date_list:
+                if date in all_stops_summary:
+                    continue
                 _, stop_summary = process_date(
-                    feed_dir, date, output_dir, numeric_stop_code, pretty)
+                    feed_dir, date, output_dir, numeric_stop_code, pretty, stop_times)
                 all_stops_summary[date] = stop_summary
+
+        # Results arrive out of order; restore date order for the index
+        all_stops_summary = {date: all_stops_summary[date] for date in date_list}
     else:
         # Sequential processing
         for date in date_list:
             _, stop_summary = process_date(
-                feed_dir, date, output_dir, numeric_stop_code, pretty)
+                feed_dir, date, output_dir, numeric_stop_code, pretty, stop_times)
             all_stops_summary[date] = stop_summary
 
     # Write index files
-    write_index_json(output_dir, all_stops_summary, pretty)
+    write_index_json(output_dir, all_stops_summary, pretty=pretty)
 
     logger.info("Stop report generation completed.")
 
     if feed_url:
-        if os.path.exists(feed_dir):
-            shutil.rmtree(feed_dir)
-            logger.info(f"Removed temporary feed directory: {feed_dir}")
+        remove_feed_directory(feed_dir)
 
 
 if __name__ == "__main__":
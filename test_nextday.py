@@ -6,7 +6,7 @@ import os
 import sys
 sys.path.append('.')
 
-from src.orchestrators import process_stop_date
+from src.orchestrators import process_stop_date, build_stop_arrivals
 
 def test_nextday_logic():
     """Test the next-day logic on a single date."""
@@ -24,8 +24,8 @@ def test_nextday_logic():
     
     # Look for any early morning trips that might be next-day trips
     early_morning_trips = []
-    for stop_code, arrivals in stop_arrivals.items():
-        for arrival in arrivals:
+    for stop_code, records in stop_arrivals.items():
+        for arrival in build_stop_arrivals(records):
             arrival_time = arrival['arrival_time']
             # Check for trips between 00:00 and 06:00 (likely next-day trips)
             if arrival_time and arrival_time.startswith(('00:', '01:', '02:', '03:', '04:', '05:')):
@@ -0,0 +1,90 @@
+import argparse
+import json
+import pytest
+from src.cli_parser import iso_date
+from src.common import date_range, get_all_feed_dates, time_to_seconds
+
+
+def write_file(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_get_all_feed_dates_spans_calendar(tmp_path):
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+
+    calendar_content = (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+        "S1,1,1,1,1,1,0,0,20250302,20250303\n"
+        "S2,0,0,0,0,0,1,1,20250226,20250301\n"
+        "S3,1,1,1,1,1,1,1,,\n"
+    )
+    write_file(feed_dir / 'calendar.txt', calendar_content)
+
+    # The range crosses the end of February
+    assert get_all_feed_dates(str(feed_dir)) == [
+        "2025-02-26", "2025-02-27", "2025-02-28", "2025-03-01", "2025-03-02", "2025-03-03"
+    ]
+
+
+def test_get_all_feed_dates_falls_back_to_calendar_dates(tmp_path):
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+
+    calendar_dates_content = (
+        "service_id,date,exception_type\n"
+        "S1,20250624,1\n"
+        "S2,20250623,1\n"
+        "S1,20250623,1\n"
+        "S3,20250625,2\n"
+    )
+    write_file(feed_dir / 'calendar_dates.txt', calendar_dates_content)
+
+    assert get_all_feed_dates(str(feed_dir)) == ["2025-06-23", "2025-06-24"]
+
+
+def test_get_all_feed_dates_uses_cache_until_calendar_changes(tmp_path, monkeypatch):
+    import src.common as common_module
+
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+    header = "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+    write_file(feed_dir / 'calendar.txt', header + "S1,1,1,1,1,1,0,0,20250301,20250302\n")
+
+    assert get_all_feed_dates(str(feed_dir)) == ["2025-03-01", "2025-03-02"]
+    with open(feed_dir / '.cache' / 'calendar_feed_dates.json', encoding='utf-8') as f:
+        assert json.load(f)['dates'] == ["2025-03-01", "2025-03-02"]
+
+    read_calls = []
+    original_read = common_module._read_calendar_feed_dates
+    monkeypatch.setattr(common_module, '_read_calendar_feed_dates',
+                        lambda path: read_calls.append(path) or original_read(path))
+
+    assert get_all_feed_dates(str(feed_dir)) == ["2025-03-01", "2025-03-02"]
+    assert read_calls == []
+
+    write_file(feed_dir / 'calendar.txt', header + "S1,1,1,1,1,1,0,0,20250301,20250303\n")
+    assert get_all_feed_dates(str(feed_dir))[-1] == "2025-03-03"
+    assert len(read_calls) == 1
+
+
+def test_date_range_is_inclusive_across_leap_day():
+    assert list(date_range("2024-02-28", "2024-03-01")) == ["2024-02-28", "2024-02-29", "2024-03-01"]
+    assert list(date_range("2024-03-01", "2024-02-28")) == []
+
+
+def test_iso_date_rejects_malformed_dates():
+    assert iso_date("2025-7-3") == "2025-07-03"
+    with pytest.raises(argparse.ArgumentTypeError):
+        iso_date("2025-02-30")
+
+
+def test_time_to_seconds_handles_fixed_and_short_hours():
+    assert time_to_seconds("08:05:09") == 8 * 3600 + 5 * 60 + 9
+    assert time_to_seconds("25:30:00") == 25 * 3600 + 30 * 60
+    assert time_to_seconds("8:05:09") == 8 * 3600 + 5 * 60 + 9
+    assert time_to_seconds("08:05") == 0
+    # Malformed times read as 0 on both the fixed-width and the split path
+    assert time_to_seconds("aa:bb:cc") == 0
+    assert time_to_seconds("a:bb:cc") == 0
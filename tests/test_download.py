@@ -1,8 +1,12 @@
+import hashlib
+import io
 import os
 import tempfile
 import json
+import zipfile
+import pytest
 from unittest.mock import patch, MagicMock
-from src.download import download_feed_from_url, _load_metadata, _save_metadata, _check_if_modified
+from src.download import download_feed_from_url, _load_metadata, _save_metadata, _create_session, _extract_feed, remove_feed_directory
 
 def test_metadata_storage_and_loading():
     """Test that metadata can be saved and loaded correctly"""
@@ -36,73 +40,192 @@ def test_no_metadata_file():
         metadata = _load_metadata(temp_dir)
         assert metadata is None
 
-@patch('src.download.requests.head')
-def test_check_if_modified_304_response(mock_head):
-    """Test that 304 response is handled correctly"""
+@patch('src.download._SESSION.get')
+def test_download_with_force_flag(mock_get):
+    """Test that force download bypasses conditional checks"""
     with tempfile.TemporaryDirectory() as temp_dir:
         # Save some existing metadata
         _save_metadata(temp_dir, "existing-etag", "existing-date")
         
-        # Mock 304 response
-        mock_response = MagicMock()
-        mock_response.status_code = 304
-        mock_head.return_value = mock_response
+        mock_get_response = MagicMock()
+        mock_get_response.status_code = 200
+        mock_get_response.iter_content.return_value = [b'fake zip content']
+        mock_get_response.headers = {}
+        mock_get_response.__enter__.return_value = mock_get_response
+        mock_get.return_value = mock_get_response
         
-        is_modified, etag, last_modified = _check_if_modified("http://example.com/feed.zip", temp_dir)
+        # Mock zipfile to avoid actual extraction
+        with patch('src.download.zipfile.ZipFile'):
+            result = download_feed_from_url("http://example.com/feed.zip", temp_dir, force_download=True)
         
-        assert not is_modified
-        assert etag == "existing-etag"
-        assert last_modified == "existing-date"
+        # With force_download=True, the stored validators are not sent
+        mock_get.assert_called_once()
+        assert mock_get.call_args.kwargs['headers'] == {}
+        archive_hash = hashlib.sha256(b'fake zip content').hexdigest()[:16]
+        assert result == os.path.join(temp_dir, '.feed_cache', archive_hash)
 
-@patch('src.download.requests.head')
-def test_check_if_modified_200_response(mock_head):
-    """Test that 200 response indicates modification"""
+@patch('src.download._SESSION.get')
+def test_download_streams_body_to_zip(mock_get):
+    """Test that the feed body is streamed chunk by chunk straight into the zip reader"""
     with tempfile.TemporaryDirectory() as temp_dir:
-        # Save some existing metadata
-        _save_metadata(temp_dir, "old-etag", "old-date")
-        
-        # Mock 200 response with new headers
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {
-            'ETag': 'new-etag',
-            'Last-Modified': 'new-date'
-        }
-        mock_head.return_value = mock_response
+        mock_get_response = MagicMock()
+        mock_get_response.status_code = 200
+        mock_get_response.iter_content.return_value = [b'first-', b'second']
+        mock_get_response.headers = {}
+        mock_get_response.__enter__.return_value = mock_get_response
+        mock_get.return_value = mock_get_response
         
-        is_modified, etag, last_modified = _check_if_modified("http://example.com/feed.zip", temp_dir)
+        written = {}
         
-        assert is_modified
-        assert etag == "new-etag"
-        assert last_modified == "new-date"
-
-@patch('src.download.requests.get')
-@patch('src.download.requests.head')
-def test_download_with_force_flag(mock_head, mock_get):
-    """Test that force download bypasses conditional checks"""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Save some existing metadata
-        _save_metadata(temp_dir, "existing-etag", "existing-date")
+        def fake_zipfile(fileobj, mode):
+            written['content'] = fileobj.read()
+            return MagicMock()
         
-        # Mock responses
-        mock_head_response = MagicMock()
-        mock_head_response.status_code = 304
-        mock_head.return_value = mock_head_response
+        with patch('src.download.zipfile.ZipFile', side_effect=fake_zipfile):
+            with patch('src.download.tempfile.mkdtemp', return_value=temp_dir):
+                download_feed_from_url("http://example.com/feed.zip", force_download=True)
         
+        assert mock_get.call_args.kwargs.get('stream') is True
+        assert written['content'] == b'first-second'
+
+@patch('src.download._SESSION.get')
+def test_download_removes_extract_dir_on_bad_archive(mock_get):
+    """Test that a download that cannot be extracted leaves no temporary directory behind"""
+    with tempfile.TemporaryDirectory() as temp_dir:
         mock_get_response = MagicMock()
         mock_get_response.status_code = 200
-        mock_get_response.content = b'fake zip content'
+        mock_get_response.iter_content.return_value = [b'not a zip archive']
         mock_get_response.headers = {}
+        mock_get_response.__enter__.return_value = mock_get_response
         mock_get.return_value = mock_get_response
         
-        # Mock zipfile to avoid actual extraction
-        with patch('src.download.zipfile.ZipFile'):
-            with patch('src.download.tempfile.mkdtemp', return_value='/tmp/fake'):
-                with patch('src.download.os.remove'):
-                    result = download_feed_from_url("http://example.com/feed.zip", temp_dir, force_download=True)
+        extract_dir = os.path.join(temp_dir, 'extract')
+        os.makedirs(extract_dir)
         
-        # With force_download=True, the download should proceed even if server returns 304
-        # The head request should not be called because we're forcing download
+        with patch('src.download.tempfile.mkdtemp', return_value=extract_dir):
+            with pytest.raises(zipfile.BadZipFile):
+                download_feed_from_url("http://example.com/feed.zip", force_download=True)
+        
+        assert not os.path.exists(extract_dir)
+
+def _feed_archive(stops):
+    """Build an in-memory feed archive whose stops.txt holds the given content."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('stops.txt', stops)
+        archive.writestr('shapes.txt', 'shape_id\n')
+    return buffer.getvalue()
+
+def _feed_response(body, etag):
+    """Mock a 200 response streaming body with the given ETag."""
+    response = MagicMock()
+    response.status_code = 200
+    response.iter_content.return_value = [body]
+    response.headers = {'ETag': etag}
+    response.__enter__.return_value = response
+    return response
+
+@patch('src.download._SESSION.get')
+def test_download_reuses_extracted_feed(mock_get):
+    """Test that a feed extracted under the output directory is reused with its parsed-file caches"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        mock_get.return_value = _feed_response(_feed_archive('stop_id\n1\n'), '"v1"')
+        feed_dir = download_feed_from_url("http://example.com/feed.zip", temp_dir, feed_files={'stops.txt'})
+        
+        assert os.path.dirname(feed_dir) == os.path.join(temp_dir, '.feed_cache')
+        assert sorted(os.listdir(feed_dir)) == ['.feed_source', 'stops.txt']
+        os.makedirs(os.path.join(feed_dir, '.cache'))
+        
+        # A server that ignores If-None-Match answers 200 with the same version
+        second_response = _feed_response(b'', '"v1"')
+        mock_get.return_value = second_response
+        result = download_feed_from_url("http://example.com/feed.zip", temp_dir, feed_files={'stops.txt'})
+        # Only feeds extracted to the system temporary directory are removed after a run
+        remove_feed_directory(result)
+        
+        assert result == feed_dir
+        second_response.iter_content.assert_not_called()
+        assert os.path.isdir(os.path.join(feed_dir, '.cache'))
+
+@patch('src.download._SESSION.get')
+def test_download_replaces_earlier_feed_version(mock_get):
+    """Test that a new feed version gets its own directory and the earlier one is removed"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        mock_get.return_value = _feed_response(_feed_archive('stop_id\n1\n'), '"v1"')
+        old_dir = download_feed_from_url("http://example.com/feed.zip", temp_dir)
+        
+        mock_get.return_value = _feed_response(_feed_archive('stop_id\n2\n'), '"v2"')
+        new_dir = download_feed_from_url("http://example.com/feed.zip", temp_dir)
+        
+        assert new_dir != old_dir
+        assert not os.path.exists(old_dir)
+        assert sorted(os.listdir(new_dir)) == ['.feed_source', 'shapes.txt', 'stops.txt']
+        with open(os.path.join(new_dir, 'stops.txt'), encoding='utf-8') as f:
+            assert f.read() == 'stop_id\n2\n'
+
+@patch('src.download._SESSION.get')
+@patch('src.download._SESSION.head')
+def test_download_sends_validators_on_get(mock_head, mock_get):
+    """Test that stored validators are sent on the GET and a 304 skips the download without a HEAD request"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _save_metadata(temp_dir, "existing-etag", "existing-date")
+        
+        mock_get_response = MagicMock()
+        mock_get_response.status_code = 304
+        mock_get_response.__enter__.return_value = mock_get_response
+        mock_get.return_value = mock_get_response
+        
+        with patch('src.download.tempfile.mkdtemp') as mock_mkdtemp:
+            result = download_feed_from_url("http://example.com/feed.zip", temp_dir)
+        
+        assert result is None
+        mock_mkdtemp.assert_not_called()
         mock_head.assert_not_called()
-        mock_get.assert_called_once()
-        assert result == '/tmp/fake'
\ No newline at end of file
+        sent_headers = mock_get.call_args.kwargs['headers']
+        assert sent_headers['If-None-Match'] == "existing-etag"
+        assert sent_headers['If-Modified-Since'] == "existing-date"
+
+def test_session_retries_transient_errors():
+    """Test that the shared session pools connections and retries 5xx responses"""
+    session = _create_session()
+    adapter = session.get_adapter('https://example.com/feed.zip')
+
+    assert adapter.max_retries.total == 3
+    assert 503 in adapter.max_retries.status_forcelist
+    assert session.get_adapter('http://example.com/feed.zip') is adapter
+
+def test_extract_feed_writes_every_member():
+    """Test that parallel extraction writes top-level and nested members intact"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive_path = os.path.join(temp_dir, 'feed.zip')
+        contents = {
+            'stops.txt': 'stop_id,stop_name\n1,Praza de España\n',
+            'stop_times.txt': 'trip_id,stop_id\n' + 'T1,1\n' * 1000,
+            'routes.txt': 'route_id,route_short_name\nR1,C1\n',
+            'extra/notes.txt': 'nested member\n',
+        }
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, content in contents.items():
+                archive.writestr(name, content)
+
+        extract_dir = os.path.join(temp_dir, 'extract')
+        with zipfile.ZipFile(archive_path) as zip_ref:
+            _extract_feed(zip_ref, extract_dir)
+
+        for name, content in contents.items():
+            with open(os.path.join(extract_dir, name), encoding='utf-8') as f:
+                assert f.read() == content
+
+def test_extract_feed_skips_unlisted_members():
+    """Test that only the requested feed files are extracted"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive_path = os.path.join(temp_dir, 'feed.zip')
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name in ('stops.txt', 'trips.txt', 'shapes.txt'):
+                archive.writestr(name, 'header\n')
+
+        extract_dir = os.path.join(temp_dir, 'extract')
+        with zipfile.ZipFile(archive_path) as zip_ref:
+            _extract_feed(zip_ref, extract_dir, {'stops.txt', 'trips.txt', 'calendar.txt'})
+
+        assert sorted(os.listdir(extract_dir)) == ['stops.txt', 'trips.txt']
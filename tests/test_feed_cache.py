@@ -0,0 +1,56 @@
+import os
+import pickle
+import src.feed_cache as feed_cache
+from src.feed_cache import disable_feed_cache, get_source_key, read_feed_cache, write_feed_cache
+from src.utils import dumps_json
+
+
+def test_feed_cache_round_trip_and_stale_entry(tmp_path, monkeypatch):
+    source = tmp_path / 'stops.txt'
+    source.write_text("stop_id\nS1\n", encoding='utf-8')
+
+    write_feed_cache(str(source), 'stops.json', {'S1': ['Praza de España', 1, None]})
+    assert read_feed_cache(str(source), 'stops.json') == {'S1': ['Praza de España', 1, None]}
+
+    # A changed source is detected from the key line, without parsing the data
+    source.write_text("stop_id\nS1\nS2\n", encoding='utf-8')
+    parsed = []
+    original_loads = feed_cache.loads_json
+    monkeypatch.setattr(feed_cache, 'loads_json', lambda data: parsed.append(data) or original_loads(data))
+    assert read_feed_cache(str(source), 'stops.json') is None
+    assert len(parsed) == 1
+
+
+class _PlantedPayload:
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return (os.mkdir, (self.path,))
+
+
+def test_feed_cache_rejects_planted_payload_after_valid_key(tmp_path):
+    source = tmp_path / 'stops.txt'
+    source.write_text("stop_id\nS1\n", encoding='utf-8')
+    cache_dir = tmp_path / feed_cache.FEED_CACHE_DIR
+    cache_dir.mkdir()
+    marker = tmp_path / 'payload_ran'
+
+    # A forged entry with the current key of the source, followed by a pickle that runs code
+    with open(cache_dir / 'stops.json', 'wb') as cache_file:
+        cache_file.write(dumps_json(list(get_source_key(str(source)))) + b'\n')
+        cache_file.write(pickle.dumps(_PlantedPayload(str(marker))))
+
+    assert read_feed_cache(str(source), 'stops.json') is None
+    assert not marker.exists()
+
+
+def test_feed_cache_not_written_when_disabled(tmp_path):
+    source = tmp_path / 'stops.txt'
+    source.write_text("stop_id\nS1\n", encoding='utf-8')
+
+    disable_feed_cache(str(tmp_path))
+    write_feed_cache(str(source), 'stops.json', {'S1': 'Praza de España'})
+
+    assert not (tmp_path / feed_cache.FEED_CACHE_DIR).exists()
+    assert read_feed_cache(str(source), 'stops.json') is None
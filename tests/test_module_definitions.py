@@ -0,0 +1,31 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MODULES = sorted(REPO_ROOT.glob("*.py")) + sorted((REPO_ROOT / "src").rglob("*.py"))
+
+
+def redefined_names(source: str) -> list[str]:
+    """Return top-level names that a def/class rebinds after an earlier import or definition."""
+    bound = set()
+    redefined = []
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if node.name in bound:
+                redefined.append(node.name)
+            bound.add(node.name)
+    return redefined
+
+
+def test_redefined_names_detects_shadowing():
+    source = "from x import f\ndef f(): pass\ndef g(): pass\ndef g(): pass\n"
+    assert redefined_names(source) == ["f", "g"]
+
+
+@pytest.mark.parametrize("path", MODULES, ids=lambda p: str(p.relative_to(REPO_ROOT)))
+def test_no_top_level_redefinitions(path):
+    assert redefined_names(path.read_text(encoding="utf-8")) == []
@@ -0,0 +1,31 @@
+from src.report_data import get_service_report_data_legacy
+from src.stop_times import StopTime
+from src.stops import Stop
+from src.trips import TripLine
+
+
+def test_service_report_data_includes_first_and_last_times():
+    stops = {
+        "S1": Stop("S1", "1", "Praza de España", 42.23, -8.72),
+        "S2": Stop("S2", "2", "Gran Vía", 42.22, -8.71),
+    }
+    trips = [TripLine("R1", "SV", "T1", "Centro", 0), TripLine("R1", "SV", "T2", "Centro", 0)]
+    stops_for_trips = {
+        "T1": [StopTime("T1", "09:00:00", "09:00:00", "S1", 1, None), StopTime("T1", "24:10:00", "24:10:00", "S2", 2, None)],
+        "T2": [StopTime("T2", "07:30:00", "07:30:00", "S1", 1, None), StopTime("T2", "08:00:00", "08:00:00", "S2", 2, None)],
+    }
+
+    data = get_service_report_data_legacy("unused", "SV", trips, "2025-07-14", stops_for_trips, stops)
+
+    assert [row["trip_id"] for row in data["trip_rows"]] == ["T2", "T1"]
+    assert data["first_departure"] == "07:30:00"
+    assert data["last_arrival"] == max(row["last_arrival"] for row in data["trip_rows"]) == "24:10:00"
+
+
+def test_service_report_data_without_rows_has_no_times():
+    trips = [TripLine("R1", "SV", "T1", "Centro", 0)]
+
+    data = get_service_report_data_legacy("unused", "SV", trips, "2025-07-14", {}, {})
+
+    assert data["trip_rows"] == []
+    assert data["first_departure"] is None and data["last_arrival"] is None
@@ -0,0 +1,65 @@
+import pytest
+import src.report_writer
+import src.utils
+from src.report_writer import render_and_write_html_many, write_bytes_file, write_encoded_feature_collection, write_json_file
+from src.utils import dumps_json
+
+
+def make_feature(shape_id):
+    return {
+        "type": "Feature",
+        "properties": {"shape_id": shape_id},
+        "geometry": {"type": "LineString", "coordinates": [[-8.1, 42.1], [-8.2, 42.2]]}
+    }
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_write_encoded_feature_collection_matches_write_json_file(tmp_path, monkeypatch, use_orjson, pretty, count):
+    """Test that the streamed collection is byte-for-byte what a single dump would produce"""
+    if not use_orjson:
+        monkeypatch.setattr(src.utils, "orjson", None)
+    elif src.utils.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    features = [make_feature(f"S{i}") for i in range(count)]
+    streamed_path = tmp_path / "streamed.geojson"
+    expected_path = tmp_path / "expected.geojson"
+
+    written = write_encoded_feature_collection(str(streamed_path), (dumps_json(f, pretty) for f in features), pretty)
+    write_json_file(str(expected_path), {"type": "FeatureCollection", "features": features}, pretty)
+
+    assert written == count
+    assert streamed_path.read_bytes() == expected_path.read_bytes()
+
+
+def test_write_bytes_file_replaces_existing_contents(tmp_path):
+    """Test that a shorter write truncates whatever the file held before"""
+    file_path = tmp_path / "shape.geojson"
+    file_path.write_bytes(b'{"previous":"and much longer contents"}')
+
+    write_bytes_file(str(file_path), b'{"a":1}')
+
+    assert file_path.read_bytes() == b'{"a":1}'
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_render_and_write_html_many_reports_each_page(tmp_path, monkeypatch, jobs):
+    """Test that pages are written in order and a failing page does not stop the batch"""
+    monkeypatch.setattr(src.report_writer, "PARALLEL_RENDER_MIN_PAGES", 0)
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+
+    pages = [
+        ({"dates": ["2025-07-13"], "generated_at": "now"}, str(tmp_path / "a" / "index.html")),
+        ({"dates": ["2025-07-14"], "generated_at": "now"}, str(blocker / "index.html")),
+        ({"dates": ["2025-07-15"], "generated_at": "now"}, str(tmp_path / "c" / "index.html")),
+    ]
+
+    errors = render_and_write_html_many("feed_index.html.j2", pages, jobs)
+
+    assert errors[0] is None and errors[2] is None
+    assert errors[1]
+    assert "2025-07-13" in (tmp_path / "a" / "index.html").read_text(encoding="utf-8")
+    assert "2025-07-15" in (tmp_path / "c" / "index.html").read_text(encoding="utf-8")
@@ -0,0 +1,59 @@
+from src.routes import load_routes, get_route_order, assign_route_info
+from src.trips import TripLine
+
+
+def write_file(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_get_route_order_follows_routes_file(tmp_path):
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+
+    # Two routes share a short name; the first one decides its position
+    routes_content = (
+        "route_id,route_short_name,route_color\n"
+        "R1,L4A,00FF00\n"
+        "R2,C1,FF0000\n"
+        "R3,L4A,00FF00\n"
+        "R4,15B,\n"
+    )
+    write_file(feed_dir / 'routes.txt', routes_content)
+
+    order = get_route_order(load_routes(str(feed_dir)))
+
+    assert order == {"L4A": 0, "C1": 1, "15B": 2}
+    assert sorted(["15B", "X", "L4A", "C1"], key=lambda name: order.get(name, len(order))) == ["L4A", "C1", "15B", "X"]
+
+
+def test_assign_route_info_sets_name_and_colour():
+    routes = {"R1": {"route_short_name": "C1", "route_color": "FF0000"}}
+    known = TripLine("R1", "S1", "T1", "Centro", 0)
+    unknown = TripLine("R9", "S1", "T2", "Centro", 0)
+
+    assign_route_info({"S1": [known, unknown]}, routes)
+
+    assert (known.route_short_name, known.route_color) == ("C1", "FF0000")
+    assert (unknown.route_short_name, unknown.route_color) == ("", "")
+
+
+def test_load_routes_defaults_missing_colour(tmp_path):
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+
+    # Columns in a non-standard order, with an empty and a truncated colour
+    routes_content = (
+        "route_short_name,route_id,route_color\n"
+        "C1,R1,FF0000\n"
+        "C3,R2,\n"
+        "\n"
+        "L5,R3\n"
+    )
+    write_file(feed_dir / 'routes.txt', routes_content)
+
+    assert load_routes(str(feed_dir)) == {
+        "R1": {"route_short_name": "C1", "route_color": "FF0000"},
+        "R2": {"route_short_name": "C3", "route_color": "000000"},
+        "R3": {"route_short_name": "L5", "route_color": "000000"},
+    }
@@ -0,0 +1,54 @@
+from src.shapes import load_shapes, load_shape_coordinates, shapes_to_geojson
+
+
+def write_file(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_load_shape_coordinates_matches_load_shapes(tmp_path):
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+
+    # Points are deliberately out of sequence order
+    shapes_content = (
+        "shape_id,shape_pt_lat,shape_pt_lon,shape_pt_sequence\n"
+        "A,42.2,-8.2,2\n"
+        "A,42.1,-8.1,1\n"
+        "B,42.5,-8.5,1\n"
+        "A,42.3,-8.3,3\n"
+        "B,bad,-8.6,2\n"
+    )
+    write_file(feed_dir / 'shapes.txt', shapes_content)
+
+    coordinates = load_shape_coordinates(str(feed_dir))
+
+    assert coordinates == {
+        "A": [[-8.1, 42.1], [-8.2, 42.2], [-8.3, 42.3]],
+        "B": [[-8.5, 42.5]],
+    }
+    features = shapes_to_geojson(load_shapes(str(feed_dir)))["features"]
+    assert {f["properties"]["shape_id"]: f["geometry"]["coordinates"] for f in features} == coordinates
+
+
+def test_load_shape_coordinates_uses_cache_until_shapes_change(tmp_path, monkeypatch):
+    import src.shapes as shapes_module
+
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+    write_file(feed_dir / 'shapes.txt', "shape_id,shape_pt_lat,shape_pt_lon,shape_pt_sequence\nA,42.1,-8.1,1\n")
+
+    first = load_shape_coordinates(str(feed_dir))
+    assert (feed_dir / '.cache' / 'shapes.json').exists()
+
+    parse_calls = []
+    original_parse = shapes_module._parse_shape_coordinates
+    monkeypatch.setattr(shapes_module, '_parse_shape_coordinates',
+                        lambda path: parse_calls.append(path) or original_parse(path))
+
+    assert load_shape_coordinates(str(feed_dir)) == first
+    assert parse_calls == []
+
+    write_file(feed_dir / 'shapes.txt', "shape_id,shape_pt_lat,shape_pt_lon,shape_pt_sequence\nB,42.55,-8.5,1\n")
+    assert load_shape_coordinates(str(feed_dir)) == {"B": [[-8.5, 42.55]]}
+    assert len(parse_calls) == 1
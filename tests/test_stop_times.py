@@ -0,0 +1,86 @@
+from src.stop_times import get_stops_for_trips, load_stop_times
+
+
+def write_file(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_get_stops_for_trips_filters_and_sorts(tmp_path):
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+
+    stop_times_content = (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence,shape_dist_traveled\n"
+        "T1,08:05:00,08:05:00,S2,2,150.5\n"
+        "T2,09:00:00,09:00:00,S1,1,0\n"
+        "T1,08:00:00,08:00:00,S1,1,\n"
+        "\n"
+        "T1,08:10:00,08:10:00,S3,x,300\n"
+        "T3,10:00:00,10:00:00,S4,1\n"
+    )
+    write_file(feed_dir / 'stop_times.txt', stop_times_content)
+
+    stops = get_stops_for_trips(str(feed_dir), ["T1", "T3"])
+
+    assert list(stops) == ["T1", "T3"]
+    assert [(st.stop_id, st.stop_sequence, st.shape_dist_traveled) for st in stops["T1"]] == [
+        ("S1", 1, None),
+        ("S2", 2, 150.5),
+    ]
+    # A row without the trailing distance column is still read
+    assert [(st.stop_id, st.arrival_time, st.shape_dist_traveled) for st in stops["T3"]] == [("S4", "10:00:00", None)]
+
+
+def test_get_stops_for_trips_uses_cache_until_stop_times_change(tmp_path, monkeypatch):
+    import src.stop_times as stop_times_module
+
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+    write_file(feed_dir / 'stop_times.txt', "trip_id,arrival_time,departure_time,stop_id,stop_sequence\nT1,08:00:00,08:00:00,S1,1\nT2,09:00:00,09:00:00,S2,1\n")
+
+    assert list(get_stops_for_trips(str(feed_dir), ["T1"])) == ["T1"]
+    assert (feed_dir / '.cache' / 'stop_times.json').exists()
+
+    parse_calls = []
+    original_parse = stop_times_module._parse_stop_times
+    monkeypatch.setattr(stop_times_module, '_parse_stop_times',
+                        lambda path: parse_calls.append(path) or original_parse(path))
+
+    # Trips not requested on the first call are served from the same cache entry
+    assert [st.stop_id for st in get_stops_for_trips(str(feed_dir), ["T2"])["T2"]] == ["S2"]
+    assert parse_calls == []
+
+    write_file(feed_dir / 'stop_times.txt', "trip_id,arrival_time,departure_time,stop_id,stop_sequence\nT2,09:30:00,09:30:00,S3,1\n")
+    assert [st.stop_id for st in get_stops_for_trips(str(feed_dir), ["T2"])["T2"]] == ["S3"]
+    assert len(parse_calls) == 1
+
+
+def test_get_stops_for_trips_builds_new_lists_per_call(tmp_path):
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+    write_file(feed_dir / 'stop_times.txt', "trip_id,arrival_time,departure_time,stop_id,stop_sequence\nT1,08:00:00,08:00:00,S1,1\nT2,09:00:00,09:00:00,S2,1\n")
+
+    first = get_stops_for_trips(str(feed_dir), ["T1"])
+    first["T1"].clear()
+
+    # Nothing is kept between calls, so a caller changing its result affects no one else
+    assert [st.stop_id for st in get_stops_for_trips(str(feed_dir), ["T1"])["T1"]] == ["S1"]
+
+
+def test_get_stops_for_trips_selects_from_loaded_table(tmp_path, monkeypatch):
+    import src.stop_times as stop_times_module
+
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+    write_file(feed_dir / 'stop_times.txt', "trip_id,arrival_time,departure_time,stop_id,stop_sequence\nT1,08:00:00,08:00:00,S1,1\nT2,09:00:00,09:00:00,S2,1\n")
+
+    table = load_stop_times(str(feed_dir))
+    assert list(table) == ["T1", "T2"]
+
+    disk_reads = []
+    monkeypatch.setattr(stop_times_module, 'read_feed_cache', lambda *args: disk_reads.append(args))
+
+    # A loaded table is used as given, without reading the feed again
+    assert get_stops_for_trips(str(feed_dir), ["T2"], table) == {"T2": table["T2"]}
+    assert disk_reads == []
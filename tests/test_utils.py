@@ -0,0 +1,37 @@
+import json
+import pytest
+import src.utils
+from src.utils import dumps_json
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_json_compact_and_pretty(monkeypatch, use_orjson):
+    """Test that both encoders emit UTF-8 JSON without whitespace unless pretty is requested"""
+    if not use_orjson:
+        monkeypatch.setattr(src.utils, "orjson", None)
+    elif src.utils.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    data = {"name": "Praza de España", "coordinates": [[-8.72, 42.23]]}
+
+    compact = dumps_json(data)
+    assert compact == '{"name":"Praza de España","coordinates":[[-8.72,42.23]]}'.encode('utf-8')
+
+    pretty = dumps_json(data, pretty=True)
+    assert b'\n  "name"' in pretty
+    assert json.loads(pretty) == data
+
+
+def test_process_pool_context_avoids_fork_while_threads_run():
+    """Test that worker pools are not forked while another thread is running"""
+    import threading
+
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait)
+    thread.start()
+    try:
+        assert src.utils.process_pool_context().get_start_method() != "fork"
+        assert not src.utils.fork_is_safe()
+    finally:
+        release.set()
+        thread.join()